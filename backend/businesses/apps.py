@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class BusinessesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'businesses'
+
+    def ready(self):
+        from . import authentication  # noqa: F401  (connects auth cache invalidation signals)
@@ -0,0 +1,108 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .models import Business, User
+
+def token_cache_key(raw_token):
+    """Cache key for a validated access token (the raw JWT is never stored as a key)"""
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return 'auth:token:' + hashlib.blake2b(raw_token, digest_size=16).hexdigest()
+
+def user_cache_key(user_id):
+    """Cache key for the user authenticated by a token"""
+    return f'auth:user:{user_id}'
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT Authentication with Verification Cache
+
+    Drop-in replacement for simplejwt's JWTAuthentication. Every authenticated
+    request used to verify the token signature and load the user from the
+    database; both results are now cached for a short time.
+
+    Caching Rules:
+    - Validated tokens are cached by a hash of the raw token
+    - Token entries never outlive the token's own 'exp' claim
+    - Users are loaded together with their business in a single JOIN
+    - Users are cached by id and evicted whenever the user or their business changes
+    - JWT_AUTH_CACHE_TTL (seconds) bounds both caches; 0 disables caching
+
+    Eviction only reaches the cache of the process that saved the change.
+    With the per-process LocMemCache and several gunicorn workers, other
+    workers keep serving the cached user (including a deactivated one, or
+    an old role) until their entry expires, i.e. for up to
+    JWT_AUTH_CACHE_TTL seconds. A shared cache backend makes eviction
+    apply everywhere.
+    """
+
+    def get_validated_token(self, raw_token):
+        ttl = settings.JWT_AUTH_CACHE_TTL
+        if not ttl:
+            return super().get_validated_token(raw_token)
+
+        key = token_cache_key(raw_token)
+        validated_token = cache.get(key)
+        if validated_token is not None:
+            return validated_token
+
+        validated_token = super().get_validated_token(raw_token)
+
+        remaining = int(validated_token.get('exp', 0) - time.time())
+        if remaining > 0:
+            cache.set(key, validated_token, min(remaining, ttl))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        ttl = settings.JWT_AUTH_CACHE_TTL
+        if not ttl:
+            return self.load_user(user_id)
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = self.load_user(user_id)
+            cache.set(key, user, ttl)
+        return user
+
+    def load_user(self, user_id):
+        """Fetch the user and their business in one query, rejecting unknown or inactive users"""
+        try:
+            user = User.objects.select_related('business').get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop the cached auth user so role, business and is_active changes apply
+    to the next request handled by this process (other processes pick them
+    up when their entry expires, see CachedJWTAuthentication)
+    """
+    cache.delete(user_cache_key(instance.pk))
+
+@receiver(post_save, sender=Business)
+def invalidate_cached_business_users(sender, instance, created, **kwargs):
+    """Cached users carry their business, so evict its members (in this process) when it changes"""
+    if created:
+        return
+    user_ids = instance.users.values_list('pk', flat=True)
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
@@ -1,86 +1,191 @@
+import logging
+import re
 import secrets
+import smtplib
 import string
-from django.core.mail import send_mail
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
+from django.db import transaction
+from django.utils.html import escape
 from django.utils import timezone
 from datetime import timedelta
 
-def generate_temporary_password(length=12):
-    """
-    Generate a cryptographically secure temporary password
+logger = logging.getLogger(__name__)
 
-    This function creates a random password using:
-    - Letters (uppercase and lowercase)
-    - Numbers (0-9)
-    - Special characters (!@
+EMAIL_SEND_ATTEMPTS = 3
 
-    Args:
-        length (int): Length of password to generate (default: 12)
+EMAIL_RETRY_BASE_DELAY = 2
 
-    Returns:
-        str: Secure random password
+email_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email')
 
-    Security Note: Uses secrets module for cryptographic randomness
-    """
-    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-    password = ''.join(secrets.choice(alphabet) for i in range(length))
-    return password
+TEMPORARY_PASSWORD_LIFETIME = timedelta(days=7)
 
-def send_invitation_email(user, temporary_password, invited_by):
-    """
-    Send professional invitation email to newly created user
-
-    This is the core function of the invitation system. It sends a beautifully
-    formatted email containing:
-    - Welcome message with business context
-    - Login credentials (email + temporary password)
-    - User role information
-    - Security warnings about password expiry
-    - Direct login link to the application
+ROLE_DESCRIPTIONS = {
+    'admin': 'As an Admin, you have full access to manage products, users, and all system features.',
+    'editor': 'As an Editor, you can create and edit products, but cannot approve or delete them.',
+    'approver': 'As an Approver, you can approve products for publication, but cannot create or edit them.',
+    'viewer': 'As a Viewer, you have read-only access to view products and information.',
+}
 
-    Args:
-        user: User model instance (the invited user)
-        temporary_password (str): Generated temporary password
-        invited_by: User model instance (admin who sent invitation)
+PASSWORD_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*"
 
-    Returns:
-        bool: True if email sent successfully, False otherwise
+# Largest multiple of the alphabet size that fits in a byte; bytes above it
+# would make the first characters of the alphabet more likely.
+PASSWORD_BYTE_LIMIT = 256 - 256 % len(PASSWORD_ALPHABET)
 
-    Email Features:
-    - Professional HTML template with company branding
-    - Plain text fallback for email clients that don't support HTML
-    - Responsive design that works on mobile devices
-    - Security warnings about password expiry
-    """
+# Byte -> alphabet character table, and the bytes to reject, for bytes.translate
+PASSWORD_BYTE_TABLE = bytes(ord(PASSWORD_ALPHABET[byte % len(PASSWORD_ALPHABET)]) for byte in range(256))
 
-    subject = f'Welcome to {user.business.name} - Product Marketplace'
-    login_url = "http://localhost:3000/login"
-    support_email = invited_by.email
-    current_year = timezone.now().year
+PASSWORD_REJECTED_BYTES = bytes(range(PASSWORD_BYTE_LIMIT, 256))
 
-    text_message = f"""
-Hello {user.first_name} {user.last_name},
+# Invitation email bodies are parsed once at import; send_invitation_email
+# only substitutes the $placeholders per invite.
+INVITATION_TEXT_TEMPLATE = string.Template("""
+Hello $first_name $last_name,
 
-You have been invited to join {user.business.name} on the Product Marketplace platform by {invited_by.first_name} {invited_by.last_name}.
+You have been invited to join $business_name on the Product Marketplace platform by $inviter_first_name $inviter_last_name.
 
 Your account has been created with the following details:
 
-Email: {user.email}
-Role: {user.get_role_display()}
-Temporary Password: {temporary_password}
+Email: $email
+Role: $role
+Temporary Password: $temporary_password
 
 IMPORTANT: This temporary password will expire in 7 days and must be changed on your first login.
 
 To get started:
-1. Visit: {login_url}
+1. Visit: $login_url
 2. Login with your email and temporary password
 3. You will be prompted to create your own secure password
 
 Best regards,
 Product Marketplace Team
-    """
-
-    html_message = f"""
+    """)
+
+CSS_WHITESPACE_RE = re.compile(r'\s+')
+
+CSS_PUNCTUATION_SPACE_RE = re.compile(r'\s*([{};,>])\s*')
+
+def minify_css(css):
+    """Collapse whitespace in a stylesheet, including around punctuation where it has no meaning"""
+    return CSS_PUNCTUATION_SPACE_RE.sub(r'\1', CSS_WHITESPACE_RE.sub(' ', css)).strip()
+
+INVITATION_EMAIL_CSS = """
+body {
+    font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
+    line-height: 1.6;
+    color:
+    margin: 0;
+    padding: 0;
+    -webkit-font-smoothing: antialiased;
+    background-color:
+}
+.container {
+    max-width: 600px;
+    margin: 40px auto;
+    background:
+    border-radius: 8px;
+    box-shadow: 0 4px 6px rgba(0,0,0,0.05);
+    overflow: hidden;
+}
+.header {
+    background-color:
+    padding: 30px 40px;
+    text-align: center;
+}
+.header h1 {
+    margin: 0;
+    color:
+    font-size: 24px;
+    font-weight: 600;
+    letter-spacing: 0.5px;
+}
+.content {
+    padding: 40px;
+}
+.greeting {
+    font-size: 18px;
+    margin-bottom: 20px;
+    color:
+}
+.info-box {
+    background-color:
+    border: 1px solid
+    border-radius: 6px;
+    padding: 20px;
+    margin: 25px 0;
+}
+.info-item {
+    margin-bottom: 10px;
+    font-size: 14px;
+}
+.info-label {
+    font-weight: 600;
+    color:
+    display: inline-block;
+    width: 80px;
+}
+.password-display {
+    background:
+    border: 1px dashed
+    padding: 10px;
+    margin-top: 15px;
+    text-align: center;
+    font-family: monospace;
+    font-size: 18px;
+    letter-spacing: 2px;
+    color:
+    font-weight: bold;
+    border-radius: 4px;
+}
+.expiry-note {
+    font-size: 12px;
+    color:
+    margin-top: 5px;
+    text-align: center;
+}
+.button-container {
+    text-align: center;
+    margin: 35px 0;
+}
+.button {
+    display: inline-block;
+    padding: 14px 30px;
+    background-color:
+    color:
+    text-decoration: none;
+    border-radius: 6px;
+    font-weight: 600;
+    font-size: 16px;
+    box-shadow: 0 2px 4px rgba(47, 128, 237, 0.2);
+    transition: background-color 0.2s;
+}
+.button:hover {
+    background-color:
+}
+.footer {
+    background-color:
+    padding: 20px 40px;
+    text-align: center;
+    border-top: 1px solid
+    font-size: 12px;
+    color:
+}
+.footer a {
+    color:
+    text-decoration: none;
+}
+.footer a:hover {
+    text-decoration: underline;
+}
+"""
+
+# Static part of the invitation HTML (document head, styles and banner);
+# only the content below it has placeholders. The stylesheet is minified
+# once here, so its indentation is not sent with every invitation.
+INVITATION_HTML_HEAD = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -88,113 +193,7 @@ Product Marketplace Team
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Welcome to Product Marketplace</title>
     <style>
-        body {{
-            font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
-            line-height: 1.6;
-            color:
-            margin: 0;
-            padding: 0;
-            -webkit-font-smoothing: antialiased;
-            background-color:
-        }}
-        .container {{
-            max-width: 600px;
-            margin: 40px auto;
-            background:
-            border-radius: 8px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.05);
-            overflow: hidden;
-        }}
-        .header {{
-            background-color:
-            padding: 30px 40px;
-            text-align: center;
-        }}
-        .header h1 {{
-            margin: 0;
-            color:
-            font-size: 24px;
-            font-weight: 600;
-            letter-spacing: 0.5px;
-        }}
-        .content {{
-            padding: 40px;
-        }}
-        .greeting {{
-            font-size: 18px;
-            margin-bottom: 20px;
-            color:
-        }}
-        .info-box {{
-            background-color:
-            border: 1px solid
-            border-radius: 6px;
-            padding: 20px;
-            margin: 25px 0;
-        }}
-        .info-item {{
-            margin-bottom: 10px;
-            font-size: 14px;
-        }}
-        .info-label {{
-            font-weight: 600;
-            color:
-            display: inline-block;
-            width: 80px;
-        }}
-        .password-display {{
-            background:
-            border: 1px dashed
-            padding: 10px;
-            margin-top: 15px;
-            text-align: center;
-            font-family: monospace;
-            font-size: 18px;
-            letter-spacing: 2px;
-            color:
-            font-weight: bold;
-            border-radius: 4px;
-        }}
-        .expiry-note {{
-            font-size: 12px;
-            color:
-            margin-top: 5px;
-            text-align: center;
-        }}
-        .button-container {{
-            text-align: center;
-            margin: 35px 0;
-        }}
-        .button {{
-            display: inline-block;
-            padding: 14px 30px;
-            background-color:
-            color:
-            text-decoration: none;
-            border-radius: 6px;
-            font-weight: 600;
-            font-size: 16px;
-            box-shadow: 0 2px 4px rgba(47, 128, 237, 0.2);
-            transition: background-color 0.2s;
-        }}
-        .button:hover {{
-            background-color:
-        }}
-        .footer {{
-            background-color:
-            padding: 20px 40px;
-            text-align: center;
-            border-top: 1px solid
-            font-size: 12px;
-            color:
-        }}
-        .footer a {{
-            color:
-            text-decoration: none;
-        }}
-        .footer a:hover {{
-            text-decoration: underline;
-        }}
+        """ + minify_css(INVITATION_EMAIL_CSS) + """
     </style>
 </head>
 <body>
@@ -202,24 +201,26 @@ Product Marketplace Team
         <div class="header">
             <h1>Product Marketplace</h1>
         </div>
-        <div class="content">
-            <h2 class="greeting">Hello {user.first_name},</h2>
+"""
+
+INVITATION_HTML_TEMPLATE = string.Template("""        <div class="content">
+            <h2 class="greeting">Hello $first_name,</h2>
 
-            <p>You have been invited to join <strong>{user.business.name}</strong> on the Product Marketplace platform.</p>
+            <p>You have been invited to join <strong>$business_name</strong> on the Product Marketplace platform.</p>
             <p>Your account has been created for you. Please use the credentials below to log in for the first time.</p>
 
             <div class="info-box">
                 <div class="info-item">
                     <span class="info-label">Email:</span>
-                    <span>{user.email}</span>
+                    <span>$email</span>
                 </div>
                 <div class="info-item">
                     <span class="info-label">Role:</span>
-                    <span>{user.get_role_display()}</span>
+                    <span>$role</span>
                 </div>
 
                 <div class="password-display">
-                    {temporary_password}
+                    $temporary_password
                 </div>
                 <div class="expiry-note">
                     ⚠️ Temporary password expires in 7 days
@@ -227,36 +228,273 @@ Product Marketplace Team
             </div>
 
             <div class="button-container">
-                <a href="{login_url}" class="button">Access Your Dashboard</a>
+                <a href="$login_url" class="button">Access Your Dashboard</a>
             </div>
         </div>
         <div class="footer">
-            <p>This invitation was sent by {invited_by.first_name} {invited_by.last_name} ({invited_by.email}).</p>
+            <p>This invitation was sent by $inviter_first_name $inviter_last_name ($inviter_email).</p>
             <p>
                 Product Marketplace Inc.<br>
-                &copy; {current_year} All rights reserved.
+                &copy; $current_year All rights reserved.
             </p>
         </div>
     </div>
 </body>
 </html>
+    """)
+
+def generate_temporary_password(length=12):
     """
+    Generate a cryptographically secure temporary password
+
+    This function creates a random password using:
+    - Letters (uppercase and lowercase)
+    - Numbers (0-9)
+    - Special characters (!@
+
+    Args:
+        length (int): Length of password to generate (default: 12)
+
+    Returns:
+        str: Secure random password
+
+    Security Note: Uses secrets module for cryptographic randomness. Random
+    bytes are mapped to characters by a single bytes.translate, which also
+    drops bytes >= PASSWORD_BYTE_LIMIT so every alphabet character stays
+    equally likely. 46 of every 256 byte values are dropped, so twice length
+    bytes are drawn up front: for 12 characters one draw falls short less
+    than once in 10,000 passwords, and the loop then draws again.
+    """
+    password = b''
+    while len(password) < length:
+        password += secrets.token_bytes(length * 2).translate(PASSWORD_BYTE_TABLE, PASSWORD_REJECTED_BYTES)
+    return password[:length].decode('ascii')
+
+def build_invitation_email(user, temporary_password, invited_by):
+    """
+    Render the invitation email for a newly created user
+
+    Everything that reads the user, their business or the inviter happens
+    here, in the request thread, so delivery never touches the database.
+    Values substituted into the HTML body are HTML-escaped; the plain text
+    body gets them verbatim.
+
+    Args:
+        user: User model instance (the invited user)
+        temporary_password (str): Generated temporary password
+        invited_by: User model instance (admin who sent invitation)
+
+    Returns:
+        EmailMultiAlternatives: Message with a plain text body and HTML alternative
+    """
+
+    subject = f'Welcome to {user.business.name} - Product Marketplace'
+    current_year = timezone.now().year
+
+    context = {
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email,
+        'role': user.get_role_display(),
+        'business_name': user.business.name,
+        'temporary_password': temporary_password,
+        'inviter_first_name': invited_by.first_name,
+        'inviter_last_name': invited_by.last_name,
+        'inviter_email': invited_by.email,
+        'login_url': settings.INVITATION_LOGIN_URL,
+        'current_year': current_year,
+    }
+    text_message = INVITATION_TEXT_TEMPLATE.substitute(context)
+    html_message = INVITATION_HTML_HEAD + INVITATION_HTML_TEMPLATE.substitute(
+        {key: escape(value) for key, value in context.items()}
+    )
+
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=text_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+    message.attach_alternative(html_message, 'text/html')
+    return message
+
+def deliver_email(message, connection=None):
+    """
+    Send a rendered email, retrying transient failures with exponential backoff
+
+    Waits EMAIL_RETRY_BASE_DELAY, then twice that, ... seconds between the
+    EMAIL_SEND_ATTEMPTS attempts. A refused recipient is permanent and is
+    not retried.
+
+    Args:
+        message (EmailMessage): Message to send
+        connection: Open email backend to send through (optional); it is
+            reopened after a failure so the next attempt, and the rest of a
+            batch, get a fresh session
+
+    Returns:
+        bool: True if email sent successfully, False otherwise
+    """
+    if connection is not None:
+        message.connection = connection
+
+    for attempt in range(1, EMAIL_SEND_ATTEMPTS + 1):
+        try:
+            message.send(fail_silently=False)
+            return True
+        except smtplib.SMTPRecipientsRefused:
+            logger.exception("Mail server refused recipient %s", ', '.join(message.to))
+            return False
+        except Exception:
+            if connection is not None:
+                reopen_connection(connection)
+            if attempt == EMAIL_SEND_ATTEMPTS:
+                logger.exception("Failed to send email to %s", ', '.join(message.to))
+                return False
+            time.sleep(EMAIL_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+def reopen_connection(connection):
+    """
+    Replace a possibly broken mail server session with a fresh one
+
+    Left closed, the SMTP backend would open and close a session of its own
+    for every later message. If the reopen fails, the next send opens its
+    own session and its error is retried there.
+    """
+    connection.close()
+    try:
+        connection.open()
+    except Exception:
+        logger.warning("Failed to reopen mail server connection", exc_info=True)
+
+def deliver_emails(messages):
+    """
+    Send several rendered emails over one mail server connection
+
+    Opening an SMTP session (TCP, TLS, AUTH) costs far more than sending a
+    message, so a batch shares a single session instead of one per message.
+    If the session cannot be opened, each message falls back to
+    deliver_email on its own connection (with its usual retries), so a
+    mail server outage is logged per message instead of raised.
+
+    Args:
+        messages (list): EmailMessage instances to send
+
+    Returns:
+        list: One bool per message, True if it was sent
+    """
+    if not messages:
+        return []
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        logger.exception("Failed to open mail server connection for %d emails", len(messages))
+        return [deliver_email(message) for message in messages]
 
     try:
+        return [deliver_email(message, connection) for message in messages]
+    finally:
+        connection.close()
+
+def log_email_task_failure(future):
+    """Done callback for email_executor futures, which are never read otherwise"""
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Email delivery task failed", exc_info=exception)
+
+def submit_email_task(fn, *args):
+    """Run fn(*args) on the email worker pool, logging any exception it raises"""
+    email_executor.submit(fn, *args).add_done_callback(log_email_task_failure)
+
+def send_invitation_email(user, temporary_password, invited_by):
+    """
+    Send professional invitation email to newly created user
+
+    This is the core function of the invitation system. It sends a beautifully
+    formatted email containing:
+    - Welcome message with business context
+    - Login credentials (email + temporary password)
+    - User role information
+    - Security warnings about password expiry
+    - Direct login link to the application
+
+    Sends synchronously; request handlers use queue_invitation_email so the
+    SMTP round-trip stays off the response path.
+
+    Args:
+        user: User model instance (the invited user)
+        temporary_password (str): Generated temporary password
+        invited_by: User model instance (admin who sent invitation)
 
-        send_mail(
-            subject=subject,
-            message=text_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        return True
-    except Exception as e:
+    Returns:
+        bool: True if email sent successfully, False otherwise
 
-        print(f"Failed to send email: {str(e)}")
-        return False
+    Email Features:
+    - Professional HTML template with company branding
+    - Plain text fallback for email clients that don't support HTML
+    - Responsive design that works on mobile devices
+    - Security warnings about password expiry
+    """
+    return send_invitation_emails([(user, temporary_password)], invited_by)[0]
+
+def send_invitation_emails(invitations, invited_by):
+    """
+    Send invitation emails to several new users over one connection
+
+    Args:
+        invitations (list): (user, temporary_password) pairs
+        invited_by: User model instance (admin who sent the invitations)
+
+    Returns:
+        list: One bool per invitation, True if its email was sent
+    """
+    return deliver_emails([
+        build_invitation_email(user, temporary_password, invited_by)
+        for user, temporary_password in invitations
+    ])
+
+def queue_invitation_email(user, temporary_password, invited_by):
+    """
+    Send the invitation email in the background once the user is committed
+
+    The message is rendered immediately and handed to a small worker pool
+    after the surrounding transaction commits, so the HTTP response doesn't
+    wait on the SMTP handshake and no email goes out for a rolled back user.
+    Retries happen in the worker (see deliver_email).
+
+    INVITATION_EMAIL_ASYNC = False sends on commit in the calling thread.
+
+    Args:
+        user: User model instance (the invited user)
+        temporary_password (str): Generated temporary password
+        invited_by: User model instance (admin who sent invitation)
+    """
+    queue_invitation_emails([(user, temporary_password)], invited_by)
+
+def queue_invitation_emails(invitations, invited_by):
+    """
+    Queue invitation emails for several new users as one batch
+
+    Same as queue_invitation_email, but the whole batch is delivered by one
+    worker over a single mail server connection.
+
+    Args:
+        invitations (list): (user, temporary_password) pairs
+        invited_by: User model instance (admin who sent the invitations)
+    """
+    messages = [
+        build_invitation_email(user, temporary_password, invited_by)
+        for user, temporary_password in invitations
+    ]
+    if not messages:
+        return
+
+    if settings.INVITATION_EMAIL_ASYNC:
+        transaction.on_commit(lambda: submit_email_task(deliver_emails, messages))
+    else:
+        transaction.on_commit(lambda: deliver_emails(messages))
 
 def get_role_description(role):
     """
@@ -276,32 +514,27 @@ def get_role_description(role):
     - Approver: Can approve products but not create/edit them
     - Viewer: Read-only access to view products
     """
-    descriptions = {
-        'admin': 'As an Admin, you have full access to manage products, users, and all system features.',
-        'editor': 'As an Editor, you can create and edit products, but cannot approve or delete them.',
-        'approver': 'As an Approver, you can approve products for publication, but cannot create or edit them.',
-        'viewer': 'As a Viewer, you have read-only access to view products and information.',
-    }
-    return descriptions.get(role, '')
+    return ROLE_DESCRIPTIONS.get(role, '')
 
-def set_temporary_password_expiry(user):
+def get_temporary_password_fields():
     """
-    Configure temporary password security settings for new user
+    Field values for a user who was just given a temporary password
 
-    This function sets up the security constraints for the invitation system:
-    - Sets password expiry to 7 days from now
+    This sets up the security constraints for the invitation system:
+    - Password expires 7 days from now
     - Records when invitation was sent (for audit trail)
     - Forces password change on first login
 
-    Args:
-        user: User model instance to configure
+    Invitation flows pass these straight into the user's INSERT, together
+    with the temporary password, instead of updating the row afterwards.
 
-    Security Features:
-    - Temporary passwords expire automatically
-    - Users must change password on first login
-    - Audit trail of when invitations were sent
+    Returns:
+        dict: temporary_password_expires, invitation_sent_at and
+              password_change_required
     """
-    user.temporary_password_expires = timezone.now() + timedelta(days=7)
-    user.invitation_sent_at = timezone.now()
-    user.password_change_required = True
-    user.save()
+    now = timezone.now()
+    return {
+        'temporary_password_expires': now + TEMPORARY_PASSWORD_LIFETIME,
+        'invitation_sent_at': now,
+        'password_change_required': True,
+    }
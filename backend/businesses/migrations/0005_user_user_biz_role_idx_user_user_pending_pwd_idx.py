@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0004_business_owner_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['business', 'role'], name='user_biz_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('password_change_required', True)), fields=['temporary_password_expires'], name='user_pending_pwd_idx'),
+        ),
+    ]
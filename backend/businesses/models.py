@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from .hashers import TemporaryPasswordHasher
 
 class Business(models.Model):
     """
@@ -35,16 +38,54 @@ class UserManager(BaseUserManager):
     - Removes dependency on username field
     - Supports superuser creation with admin role
     """
-    def create_user(self, email, password=None, **extra_fields):
-        """Create and return a regular user with email and password"""
+    def build_user(self, email, password=None, temporary_password=None, **extra_fields):
+        """
+        Build an unsaved user with a normalized email and hashed password
+
+        The email is normalized exactly once here; create_user and
+        bulk_create_users both go through it, so neither repeats the work.
+        Pass temporary_password instead of password for generated invitation
+        passwords (see User.set_temporary_password).
+        """
         if not email:
             raise ValueError('Email is required')
-        email = self.normalize_email(email)
-        user = self.model(email=email, **extra_fields)
-        user.set_password(password)
+        user = self.model(email=self.normalize_email(email), **extra_fields)
+        if temporary_password is not None:
+            user.set_temporary_password(temporary_password)
+        else:
+            user.set_password(password)
+        return user
+
+    def create_user(self, email, password=None, **extra_fields):
+        """Create and return a regular user with email and password"""
+        user = self.build_user(email, password, **extra_fields)
         user.save(using=self._db)
         return user
 
+    def bulk_create_users(self, specs, batch_size=500):
+        """
+        Create many users with as few INSERTs as possible
+
+        Users are built in a thread pool (the PBKDF2 hasher releases the GIL,
+        so password hashes run in parallel) and inserted with bulk_create in
+        batches of batch_size.
+
+        Args:
+            specs (list): One dict of build_user arguments per user ('email',
+                          optional 'password' and any other field)
+
+        Returns:
+            list: Created User instances
+        """
+        with ThreadPoolExecutor() as executor:
+            users = list(executor.map(lambda spec: self.build_user(**spec), specs))
+
+        return self.bulk_create(users, batch_size=batch_size)
+
+    def get_by_natural_key(self, username):
+        """Load the user with their business so login responses don't lazy-load it"""
+        return self.select_related('business').get(**{self.model.USERNAME_FIELD: username})
+
     def create_superuser(self, email, password=None, **extra_fields):
         """Create and return a superuser with admin privileges"""
         extra_fields.setdefault('is_staff', True)
@@ -71,6 +112,13 @@ class User(AbstractUser):
         ('viewer', 'Viewer'),
     ]
 
+    ROLE_PERMISSIONS = {
+        'admin': frozenset({'create_product', 'edit_product', 'approve_product', 'delete_product', 'view_all'}),
+        'editor': frozenset({'create_product', 'edit_product', 'view_all'}),
+        'approver': frozenset({'approve_product', 'view_all'}),
+        'viewer': frozenset({'view_all'}),
+    }
+
     username = None
     email = models.EmailField(unique=True)
 
@@ -87,13 +135,36 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['business', 'role'], name='user_biz_role_idx'),
+            models.Index(
+                fields=['temporary_password_expires'],
+                condition=models.Q(password_change_required=True),
+                name='user_pending_pwd_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.email
 
+    def set_temporary_password(self, raw_password):
+        """
+        Set a generated invitation password using TemporaryPasswordHasher
+
+        Like set_password, but hashed with the cheap temporary hasher; the
+        hash is upgraded to the default hasher on the user's first login.
+        """
+        self.password = make_password(raw_password, hasher=TemporaryPasswordHasher.algorithm)
+        self._password = raw_password
+
     def has_permission(self, permission):
         """
         Check if user has specific permission based on their role
 
+        Looks the permission up in ROLE_PERMISSIONS, which is built once at
+        import time rather than on every call.
+
         Permission Matrix:
         - Admin: All permissions (create, edit, approve, delete, view)
         - Editor: Create and edit products, view all
@@ -106,10 +177,4 @@ class User(AbstractUser):
         Returns:
             bool: True if user has permission, False otherwise
         """
-        permissions_map = {
-            'admin': ['create_product', 'edit_product', 'approve_product', 'delete_product', 'view_all'],
-            'editor': ['create_product', 'edit_product', 'view_all'],
-            'approver': ['approve_product', 'view_all'],
-            'viewer': ['view_all'],
-        }
-        return permission in permissions_map.get(self.role, [])
+        return permission in self.ROLE_PERMISSIONS.get(self.role, frozenset())
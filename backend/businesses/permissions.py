@@ -15,12 +15,12 @@ class UserManagementPermission(BasePermission):
         if user.is_superuser:
             return True
 
-        if getattr(user, "role", None) == "admin":
-            business = getattr(user, "business", None)
-            if not business:
+        if user.role == "admin":
+            if not user.business_id:
                 return False
 
-            if view.action == "create" and not business.can_create_users:
+            # Only creating users needs the business row; business_id is on the user
+            if view.action in ("create", "bulk_invite") and not user.business.can_create_users:
                 return False
 
             return True
@@ -35,7 +35,7 @@ class UserManagementPermission(BasePermission):
         if user.is_superuser:
             return True
 
-        if getattr(user, "role", None) == "admin":
-            return getattr(obj, "business_id", None) == getattr(user, "business_id", None)
+        if user.role == "admin":
+            return obj.business_id == user.business_id
 
-        return getattr(obj, "id", None) == getattr(user, "id", None)
+        return obj.id == user.id
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Business, User
 
@@ -20,6 +21,36 @@ class BusinessSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'can_create_users', 'can_assign_roles', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
+class UserListSerializer(serializers.ListSerializer):
+    """
+    Renders lists of users without per-field DRF dispatch
+
+    Builds each row directly from the user's attributes instead of running
+    every field's get_attribute/to_representation; the output is identical
+    to UserSerializer's. Keep it in sync when UserSerializer's fields change.
+    """
+
+    def to_representation(self, data):
+        users = data.all() if hasattr(data, 'all') else data
+        return [self.user_row(user) for user in users]
+
+    def user_row(self, user):
+        row = {
+            'id': user.id,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'role': user.role,
+            'business': user.business_id,
+            'business_name': user.business.name if user.business_id else None,
+            'is_active': user.is_active,
+            'password_change_required': user.password_change_required,
+        }
+        if not user.business_id:
+            # UserSerializer skips business_name when there is no business
+            del row['business_name']
+        return row
+
 class UserSerializer(serializers.ModelSerializer):
     """
     User Data Serializer
@@ -37,6 +68,8 @@ class UserSerializer(serializers.ModelSerializer):
     - User management by admins
     - Login responses
     - User invitation system
+
+    Lists (many=True) are rendered by UserListSerializer.
     """
     business_name = serializers.CharField(source='business.name', read_only=True)
     password = serializers.CharField(write_only=True, required=False)
@@ -47,6 +80,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'first_name', 'last_name', 'role', 'business', 'business_name',
                   'password', 'is_active', 'password_change_required']
         read_only_fields = ['id', 'password_change_required']
+        list_serializer_class = UserListSerializer
 
     def create(self, validated_data):
         """
@@ -54,13 +88,10 @@ class UserSerializer(serializers.ModelSerializer):
 
         Handles password encryption and user creation.
         If no password provided, sets unusable password (for invitation system).
+        The invitation flow passes temporary_password (and the invitation
+        fields) to save(), so the invited user is written by a single INSERT.
         """
-        password = validated_data.pop('password', None)
-        user = User(**validated_data)
-        if password:
-            user.set_password(password)
-        else:
-            user.set_unusable_password()
+        user = User.objects.build_user(**validated_data)
         user.save()
         return user
 
@@ -69,17 +100,67 @@ class UserSerializer(serializers.ModelSerializer):
         Update existing user with proper password handling
 
         Updates user fields and handles password changes securely.
+        Only the submitted columns are written, so a partial update does
+        not overwrite fields changed concurrently by another request.
         """
         password = validated_data.pop('password', None)
+        update_fields = list(validated_data)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
         if password:
             instance.set_password(password)
-        instance.save()
+            update_fields.append('password')
+        instance.save(update_fields=update_fields)
         return instance
 
+class UserInvitationListSerializer(serializers.ListSerializer):
+    """
+    Validates a batch of invitations with one query
+
+    Email uniqueness is checked for the whole batch at once (against existing
+    users and within the batch) instead of one SELECT per invitee.
+    Superusers have no business to invite into, so every invitee they post
+    must name one.
+    """
+
+    def validate(self, attrs):
+        request = self.context.get('request')
+        if request and request.user.is_superuser and any(not invitation.get('business') for invitation in attrs):
+            raise serializers.ValidationError("Every invitation needs a business")
+
+        emails = [User.objects.normalize_email(invitation['email']) for invitation in attrs]
+
+        if len(set(emails)) != len(emails):
+            raise serializers.ValidationError("Each email can only be invited once")
+
+        existing = list(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        if existing:
+            raise serializers.ValidationError(f"Users already exist: {', '.join(existing)}")
+
+        return attrs
+
+class UserInvitationSerializer(serializers.ModelSerializer):
+    """
+    Bulk User Invitation Serializer
+
+    One entry of the list posted to the bulk invitation endpoint. Passwords
+    are never submitted: every invitee gets a generated temporary password.
+
+    Fields:
+    - email: Invitee's email address (unique across the batch and platform)
+    - first_name/last_name: Invitee's name
+    - role: Role in the business (defaults to viewer)
+    - business: Required for superusers; admins always invite into their
+      own business
+    """
+    class Meta:
+        model = User
+        fields = ['email', 'first_name', 'last_name', 'role', 'business']
+        extra_kwargs = {'email': {'validators': []}}
+        list_serializer_class = UserInvitationListSerializer
+
 class RegisterSerializer(serializers.ModelSerializer):
     """
     User Registration Serializer
@@ -117,12 +198,15 @@ class RegisterSerializer(serializers.ModelSerializer):
 
         Registration workflow:
         1. Extract business data from user data
-        2. Create user account with encrypted password
-        3. Create business with user as owner
-        4. Associate user with the business
+        2. Create the business
+        3. Create user account with encrypted password in that business
+        4. Record the user as business owner
         5. Set default admin role for business owner
 
-        This creates a complete business setup in one operation.
+        This creates a complete business setup in one operation. The business
+        is inserted first so the user row is written once with its business
+        already set; only the owner column is updated afterwards, and the
+        whole setup rolls back together if any step fails.
         """
 
         business_name = validated_data.pop('business_name')
@@ -130,23 +214,24 @@ class RegisterSerializer(serializers.ModelSerializer):
         can_assign_roles = validated_data.pop('can_assign_roles', True)
         role = validated_data.get('role', 'admin')
 
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            password=validated_data['password'],
-            first_name=validated_data.get('first_name', ''),
-            last_name=validated_data.get('last_name', ''),
-            role=role
-        )
-
-        business = Business.objects.create(
-            name=business_name,
-            can_create_users=can_create_users,
-            can_assign_roles=can_assign_roles,
-            owner=user
-        )
-
-        user.business = business
-        user.save()
+        with transaction.atomic():
+            business = Business.objects.create(
+                name=business_name,
+                can_create_users=can_create_users,
+                can_assign_roles=can_assign_roles
+            )
+
+            user = User.objects.create_user(
+                email=validated_data['email'],
+                password=validated_data['password'],
+                first_name=validated_data.get('first_name', ''),
+                last_name=validated_data.get('last_name', ''),
+                role=role,
+                business=business
+            )
+
+            business.owner = user
+            business.save(update_fields=['owner', 'updated_at'])
 
         return user
 
@@ -177,7 +262,8 @@ class ChangePasswordSerializer(serializers.Serializer):
     Validation Rules:
     - New password must be at least 8 characters
     - New password must match confirmation
-    - New password must be different from old password
+    - New password must be different from old password (checked by the
+      change_password view once the old password has been verified)
 
     Fields:
     - old_password: Current password (temporary for new users)
@@ -199,8 +285,9 @@ class ChangePasswordSerializer(serializers.Serializer):
 
         Security checks:
         1. New password must match confirmation
-        2. New password must be different from old password
-        3. Both enforced at serializer level for security
+
+        Reuse of the old password is rejected by the view after it has
+        verified the old password, so no plaintext comparison happens here.
 
         Returns validated data or raises ValidationError
         """
@@ -208,7 +295,4 @@ class ChangePasswordSerializer(serializers.Serializer):
         if data['new_password'] != data['confirm_password']:
             raise serializers.ValidationError("New passwords do not match")
 
-        if data['old_password'] == data['new_password']:
-            raise serializers.ValidationError("New password must be different from old password")
-
         return data
@@ -0,0 +1,431 @@
+import smtplib
+from datetime import timedelta
+from unittest import mock
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from businesses.email_service import (PASSWORD_ALPHABET, deliver_emails, generate_temporary_password,
+                                      log_email_task_failure)
+from businesses.models import Business, User
+from businesses.serializers import UserSerializer
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.business = Business.objects.create(name="Test Business")
+
+        self.user = User.objects.create_user(
+            email="viewer@test.com",
+            password="testpass123",
+            business=self.business,
+            role="viewer"
+        )
+
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_repeat_requests_skip_user_lookup(self):
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.json()['email'], 'viewer@test.com')
+
+    def test_user_changes_invalidate_cache(self):
+        self.client.get('/api/auth/me/')
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_business_changes_invalidate_cache(self):
+        self.client.get('/api/auth/me/')
+
+        self.business.name = "Renamed Business"
+        self.business.save()
+
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.json()['business_name'], 'Renamed Business')
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class RegisterTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_register_creates_owned_business(self):
+        response = self.client.post('/api/auth/register/', {
+            'email': 'owner@test.com',
+            'password': 'testpass123',
+            'first_name': 'Owner',
+            'last_name': 'User',
+            'business_name': 'New Business'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['user']['business_name'], 'New Business')
+
+        user = User.objects.select_related('business').get(email='owner@test.com')
+        self.assertEqual(user.business.owner_id, user.pk)
+        self.assertEqual(user.role, 'admin')
+        self.assertTrue(user.check_password('testpass123'))
+
+class ChangePasswordTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.user = User.objects.create_user(
+            email="viewer@test.com",
+            password="testpass123",
+            role="viewer",
+            password_change_required=True
+        )
+
+    def test_change_password_clears_flag(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post('/api/auth/change-password/', {
+            'old_password': 'testpass123',
+            'new_password': 'newpass456',
+            'confirm_password': 'newpass456'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpass456'))
+        self.assertFalse(self.user.password_change_required)
+
+    def test_reusing_old_password_rejected(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post('/api/auth/change-password/', {
+            'old_password': 'testpass123',
+            'new_password': 'testpass123',
+            'confirm_password': 'testpass123'
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password_change_required)
+
+class UserListTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.business = Business.objects.create(name="Test Business")
+
+        self.admin = User.objects.create_user(
+            email="admin@test.com",
+            password="testpass123",
+            business=self.business,
+            role="admin"
+        )
+
+        for idx in range(3):
+            User.objects.create_user(
+                email=f"user{idx}@test.com",
+                password="testpass123",
+                business=self.business,
+                role="viewer"
+            )
+
+    def test_user_list_joins_business(self):
+        self.client.force_authenticate(user=self.admin)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/auth/users/')
+
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('"password"', queries[-1]['sql'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 4)
+        self.assertEqual({user['business_name'] for user in response.json()['results']}, {'Test Business'})
+
+    def test_list_rows_match_user_serializer(self):
+        users = list(User.objects.select_related('business').order_by('id'))
+        users.append(User.objects.create_user(email="nobusiness@test.com", password="testpass123"))
+
+        self.assertEqual(UserSerializer(users, many=True).data, [UserSerializer(user).data for user in users])
+
+    def test_admin_cannot_delete_users_of_other_businesses(self):
+        other = User.objects.create_user(
+            email="other@test.com",
+            password="testpass123",
+            business=Business.objects.create(name="Other Business"),
+            role="viewer"
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.delete(f'/api/auth/users/{other.pk}/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(User.objects.filter(pk=other.pk).exists())
+
+    def test_partial_update_writes_only_changed_fields(self):
+        self.client.force_authenticate(user=self.admin)
+        user = User.objects.get(email='user0@test.com')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/auth/users/{user.pk}/', {'first_name': 'Renamed'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        update = next(query['sql'] for query in queries if query['sql'].startswith('UPDATE'))
+        self.assertIn('"first_name"', update)
+        self.assertNotIn('"password"', update)
+        self.assertNotIn('"email"', update)
+
+        user.refresh_from_db()
+        self.assertEqual(user.first_name, 'Renamed')
+        self.assertTrue(user.check_password('testpass123'))
+
+@override_settings(INVITATION_EMAIL_ASYNC=False)
+class UserInvitationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.business = Business.objects.create(name="Test Business")
+
+        self.admin = User.objects.create_user(
+            email="admin@test.com",
+            password="testpass123",
+            business=self.business,
+            role="admin"
+        )
+
+    def test_invitation_sent_after_commit(self):
+        self.client.force_authenticate(user=self.admin)
+
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/auth/users/', {
+                'email': 'new@test.com',
+                'first_name': 'New <b>',
+                'last_name': 'User',
+                'role': 'editor'
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        self.assertEqual(len(mail.outbox), 0)
+
+        invited = User.objects.get(email='new@test.com')
+        self.assertTrue(invited.password_change_required)
+        self.assertEqual(invited.temporary_password_expires - invited.invitation_sent_at, timedelta(days=7))
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['new@test.com'])
+        self.assertEqual(mail.outbox[0].subject, 'Welcome to Test Business - Product Marketplace')
+        self.assertIn('Hello New <b> User,', mail.outbox[0].body)
+        self.assertIn('Hello New &lt;b&gt;,', mail.outbox[0].alternatives[0][0])
+
+        temporary_password = mail.outbox[0].body.split('Temporary Password: ')[1].splitlines()[0]
+        invited.refresh_from_db()
+        self.assertTrue(invited.password.startswith('pbkdf2_sha256_temp$'))
+        self.assertTrue(invited.check_password(temporary_password))
+
+    def test_temporary_password_upgraded_on_login(self):
+        invited = User.objects.create_user(email='new@test.com', temporary_password='Temp-pass-123')
+
+        response = self.client.post('/api/auth/login/', {'email': 'new@test.com', 'password': 'Temp-pass-123'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        invited.refresh_from_db()
+        self.assertTrue(invited.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(invited.check_password('Temp-pass-123'))
+
+    def test_bulk_invite_creates_users_and_sends_emails(self):
+        self.client.force_authenticate(user=self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/users/bulk-invite/', [
+                {'email': f'invitee{idx}@test.com', 'first_name': f'Invitee {idx}', 'role': 'editor'}
+                for idx in range(3)
+            ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual({user['business_name'] for user in response.json()}, {'Test Business'})
+
+        invited = User.objects.get(email='invitee1@test.com')
+        self.assertEqual(invited.business, self.business)
+        self.assertEqual(invited.role, 'editor')
+        self.assertTrue(invited.password_change_required)
+        self.assertEqual(invited.temporary_password_expires - invited.invitation_sent_at, timedelta(days=7))
+
+        self.assertEqual(len(mail.outbox), 3)
+        message = next(message for message in mail.outbox if message.to == ['invitee1@test.com'])
+        temporary_password = message.body.split('Temporary Password: ')[1].splitlines()[0]
+        self.assertTrue(invited.check_password(temporary_password))
+
+    def test_superuser_bulk_invite_requires_business(self):
+        superuser = User.objects.create_superuser(email="root@test.com", password="testpass123")
+        self.client.force_authenticate(user=superuser)
+
+        response = self.client.post('/api/auth/users/bulk-invite/', [
+            {'email': 'invitee@test.com', 'business': self.business.pk},
+            {'email': 'orphan@test.com'}
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email__in=['invitee@test.com', 'orphan@test.com']).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/users/bulk-invite/', [
+                {'email': 'invitee@test.com', 'business': self.business.pk}
+            ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(User.objects.get(email='invitee@test.com').business, self.business)
+
+    def test_empty_bulk_invite_queues_nothing(self):
+        self.client.force_authenticate(user=self.admin)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/auth/users/bulk-invite/', [], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(callbacks, [])
+
+    def test_bulk_invite_rejects_existing_and_duplicate_emails(self):
+        self.client.force_authenticate(user=self.admin)
+
+        for emails in (['admin@test.com'], ['same@test.com', 'same@test.com']):
+            response = self.client.post('/api/auth/users/bulk-invite/', [
+                {'email': email} for email in emails
+            ], format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_business_initial_user_invited(self):
+        self.client.force_authenticate(user=self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/businesses/', {
+                'name': 'Second Business',
+                'initial_user': {'email': 'first@test.com', 'first_name': 'First', 'role': 'editor'}
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        invited = User.objects.get(email='first@test.com')
+        self.assertEqual(invited.business.name, 'Second Business')
+        self.assertTrue(invited.password_change_required)
+        self.assertIsNotNone(invited.temporary_password_expires)
+
+        self.assertEqual(len(mail.outbox), 1)
+        temporary_password = mail.outbox[0].body.split('Temporary Password: ')[1].splitlines()[0]
+        self.assertTrue(invited.check_password(temporary_password))
+
+class SessionEmailBackend(LocmemEmailBackend):
+    """Locmem backend that tracks sessions like SMTP and drops one send to fail@test.com"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.session_open = False
+        self.sessions = 0
+        self.failures_left = 1
+
+    def open(self):
+        self.session_open = True
+        self.sessions += 1
+
+    def close(self):
+        self.session_open = False
+
+    def send_messages(self, messages):
+        if not self.session_open:
+            self.sessions += 1
+        if messages[0].to == ['fail@test.com'] and self.failures_left:
+            self.failures_left -= 1
+            raise smtplib.SMTPServerDisconnected('connection dropped')
+        return super().send_messages(messages)
+
+class EmailDeliveryTestCase(TestCase):
+    def test_failed_send_reopens_shared_connection(self):
+        recipients = ['first@test.com', 'fail@test.com', 'third@test.com', 'fourth@test.com']
+        messages = [mail.EmailMessage('Subject', 'Body', to=[recipient]) for recipient in recipients]
+        backend = SessionEmailBackend()
+
+        with mock.patch('businesses.email_service.get_connection', return_value=backend), \
+                mock.patch('businesses.email_service.time.sleep'):
+            sent = deliver_emails(messages)
+
+        self.assertEqual(sent, [True, True, True, True])
+        self.assertEqual(backend.sessions, 2)
+        self.assertEqual([message.to[0] for message in mail.outbox], recipients)
+
+
+    def test_connection_failure_falls_back_to_single_sends(self):
+        messages = [mail.EmailMessage('Subject', 'Body', to=[f'user{idx}@test.com']) for idx in range(2)]
+        broken = mock.Mock()
+        broken.open.side_effect = OSError('connection refused')
+
+        with mock.patch('businesses.email_service.get_connection', return_value=broken), \
+                self.assertLogs('businesses.email_service', 'ERROR'):
+            sent = deliver_emails(messages)
+
+        self.assertEqual(sent, [True, True])
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_empty_batch_opens_no_connection(self):
+        with mock.patch('businesses.email_service.get_connection') as get_connection:
+            self.assertEqual(deliver_emails([]), [])
+
+        get_connection.assert_not_called()
+
+    def test_failed_email_task_is_logged(self):
+        future = mock.Mock()
+        future.exception.return_value = RuntimeError('worker crashed')
+
+        with self.assertLogs('businesses.email_service', 'ERROR') as logs:
+            log_email_task_failure(future)
+
+        self.assertIn('worker crashed', logs.output[0])
+
+class TemporaryPasswordTestCase(TestCase):
+    def test_password_drawn_in_one_call(self):
+        with mock.patch('businesses.email_service.secrets.token_bytes',
+                        return_value=bytes(range(24))) as token_bytes:
+            password = generate_temporary_password()
+
+        token_bytes.assert_called_once_with(24)
+        self.assertEqual(password, PASSWORD_ALPHABET[:12])
+
+    def test_rejected_bytes_trigger_another_draw(self):
+        with mock.patch('businesses.email_service.secrets.token_bytes',
+                        side_effect=[bytes([255] * 24), bytes(range(24))]):
+            self.assertEqual(generate_temporary_password(), PASSWORD_ALPHABET[:12])
+
+class BulkCreateUsersTestCase(TestCase):
+    def test_bulk_create_users_in_one_insert(self):
+        business = Business.objects.create(name="Test Business")
+
+        with self.assertNumQueries(1):
+            users = User.objects.bulk_create_users([
+                {'email': f'user{idx}@TEST.com', 'password': f'pass{idx}', 'business': business, 'role': 'editor'}
+                for idx in range(3)
+            ])
+
+        self.assertEqual(len(users), 3)
+        created = User.objects.get(email='user1@test.com')
+        self.assertEqual(created.role, 'editor')
+        self.assertTrue(created.check_password('pass1'))
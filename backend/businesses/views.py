@@ -1,17 +1,24 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from django.utils.crypto import constant_time_compare
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 from .models import Business, User
-from .serializers import BusinessSerializer, UserSerializer, RegisterSerializer, LoginSerializer, ChangePasswordSerializer
-from .email_service import generate_temporary_password, send_invitation_email, set_temporary_password_expiry
+from .serializers import (BusinessSerializer, UserSerializer, UserInvitationSerializer, RegisterSerializer,
+                          LoginSerializer, ChangePasswordSerializer)
+from .email_service import (generate_temporary_password, get_temporary_password_fields, queue_invitation_email,
+                            queue_invitation_emails)
 from .permissions import UserManagementPermission
 
+USER_LIST_COLUMNS = ('id', 'email', 'first_name', 'last_name', 'role', 'business', 'business__name',
+                     'is_active', 'password_change_required')
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
@@ -120,6 +127,7 @@ def change_password(request):
     Security Features:
     - Verifies current password before allowing change
     - Checks if temporary password has expired (7 days)
+    - Rejects reusing the current password
     - Clears password_change_required flag after successful change
     - Removes temporary password expiry date
 
@@ -129,18 +137,26 @@ def change_password(request):
     serializer = ChangePasswordSerializer(data=request.data)
     if serializer.is_valid():
         user = request.user
+        old_password = serializer.validated_data['old_password']
+        new_password = serializer.validated_data['new_password']
 
-        if not user.check_password(serializer.validated_data['old_password']):
+        if not user.check_password(old_password):
             return Response({'error': 'Current password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
 
         if user.temporary_password_expires and timezone.now() > user.temporary_password_expires:
             return Response({'error': 'Temporary password has expired. Please contact your administrator.'},
                           status=status.HTTP_400_BAD_REQUEST)
 
-        user.set_password(serializer.validated_data['new_password'])
+        # old_password was just verified against the stored hash, so comparing
+        # it with new_password is equivalent to hashing new_password again
+        if constant_time_compare(old_password, new_password):
+            return Response({'error': 'New password must be different from old password'},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        user.set_password(new_password)
         user.password_change_required = False
         user.temporary_password_expires = None
-        user.save()
+        user.save(update_fields=['password', 'password_change_required', 'temporary_password_expires'])
 
         return Response({'message': 'Password changed successfully'})
 
@@ -175,14 +191,21 @@ class BusinessViewSet(viewsets.ModelViewSet):
         - Superusers: See all businesses (for platform administration)
         - Business owners: See businesses they own
         - Regular users: See only their associated business
+
+        Both conditions are columns of the business row itself (owner_id, id),
+        so no join is involved and no DISTINCT is needed. Users without a
+        business only need the owner_id lookup.
         """
         if self.request.user.is_superuser:
             return Business.objects.all()
 
+        if not self.request.user.business_id:
+            return Business.objects.filter(owner=self.request.user)
+
         return Business.objects.filter(
             Q(owner=self.request.user) |
             Q(id=self.request.user.business_id)
-        ).distinct()
+        )
 
     def perform_create(self, serializer):
         """
@@ -195,34 +218,35 @@ class BusinessViewSet(viewsets.ModelViewSet):
 
         This supports the workflow where business owners can create
         their company and immediately invite their first employee.
+        The business and the initial user are committed together; the
+        invitation email is only sent once that commit succeeds.
         """
-        business = serializer.save(owner=self.request.user)
-
         initial_user_data = self.request.data.get('initial_user')
-        if initial_user_data:
-            email = initial_user_data.get('email')
-            first_name = initial_user_data.get('first_name', '')
-            last_name = initial_user_data.get('last_name', '')
-            role = initial_user_data.get('role', 'viewer')
 
-            if email:
+        with transaction.atomic():
+            business = serializer.save(owner=self.request.user)
+
+            if initial_user_data:
+                email = initial_user_data.get('email')
+                first_name = initial_user_data.get('first_name', '')
+                last_name = initial_user_data.get('last_name', '')
+                role = initial_user_data.get('role', 'viewer')
 
-                user = User.objects.create(
-                    email=email,
-                    first_name=first_name,
-                    last_name=last_name,
-                    role=role,
-                    business=business,
-                    password_change_required=True
-                )
+                if email:
 
-                temp_password = generate_temporary_password()
-                user.set_password(temp_password)
+                    temp_password = generate_temporary_password()
 
-                set_temporary_password_expiry(user)
-                user.save()
+                    user = User.objects.create_user(
+                        email=email,
+                        temporary_password=temp_password,
+                        first_name=first_name,
+                        last_name=last_name,
+                        role=role,
+                        business=business,
+                        **get_temporary_password_fields()
+                    )
 
-                send_invitation_email(user, temp_password, self.request.user)
+                    queue_invitation_email(user, temp_password, self.request.user)
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -257,12 +281,19 @@ class UserViewSet(viewsets.ModelViewSet):
         - Other roles: See only their own profile
 
         This ensures business isolation and proper access control.
+        The business is joined in because UserSerializer renders business_name
+        for every user. Lists only load the columns UserSerializer renders,
+        leaving password hashes and login timestamps out of every row.
         """
+        users = User.objects.select_related('business')
+        if self.action == 'list':
+            users = users.only(*USER_LIST_COLUMNS)
+
         if self.request.user.is_superuser:
-            return User.objects.all()
+            return users
         if self.request.user.role == 'admin':
-            return User.objects.filter(business=self.request.user.business)
-        return User.objects.filter(id=self.request.user.id)
+            return users.filter(business_id=self.request.user.business_id)
+        return users.filter(id=self.request.user.id)
 
     def perform_create(self, serializer):
         """
@@ -271,9 +302,9 @@ class UserViewSet(viewsets.ModelViewSet):
         This is the core of the user invitation workflow:
         1. Validate that only admins can create users
         2. Create user with temporary password
-        3. Set password change requirements and expiry
-        4. Send professional invitation email
-        5. Handle email failures gracefully
+        3. Set password change requirements and expiry (in the same INSERT)
+        4. Queue professional invitation email (sent after commit, off the request path)
+        5. Handle email failures gracefully (retried and logged by the email worker)
 
         The created user will have:
         - Temporary password (expires in 7 days)
@@ -281,28 +312,59 @@ class UserViewSet(viewsets.ModelViewSet):
         - invitation_sent_at timestamp
         """
 
+        temp_password = generate_temporary_password()
+        invitation = {'temporary_password': temp_password, **get_temporary_password_fields()}
+
         if self.request.user.is_superuser:
 
-            user = serializer.save()
+            user = serializer.save(**invitation)
         else:
 
             if self.request.user.role != 'admin':
                 raise PermissionDenied("You don't have permission to create users")
 
-            user = serializer.save(business=self.request.user.business)
+            user = serializer.save(business=self.request.user.business, **invitation)
 
-        temp_password = generate_temporary_password()
+        queue_invitation_email(user, temp_password, self.request.user)
+
+        return user
 
-        user.set_password(temp_password)
+    @action(detail=False, methods=['post'], url_path='bulk-invite')
+    def bulk_invite(self, request):
+        """
+        Invite many users at once
 
-        set_temporary_password_expiry(user)
+        Same invitation workflow as perform_create, for a list of invitees:
+        every user gets a temporary password, expiry and invitation timestamp,
+        all users are written with one multi-row INSERT per 500 users, and
+        the invitation emails go out as one batch after the transaction
+        commits.
 
-        email_sent = send_invitation_email(user, temp_password, self.request.user)
+        Request Body:
+        - List of {email, first_name, last_name, role} objects
 
-        if not email_sent:
-            print(f"Warning: Failed to send invitation email to {user.email}")
+        Response:
+        - The created users
+        """
+        if not request.user.is_superuser and request.user.role != 'admin':
+            raise PermissionDenied("You don't have permission to create users")
 
-        return user
+        serializer = UserInvitationSerializer(data=request.data, many=True, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        specs = []
+        passwords = []
+        for invitation in serializer.validated_data:
+            if not request.user.is_superuser:
+                invitation['business'] = request.user.business
+            passwords.append(generate_temporary_password())
+            specs.append({**invitation, **get_temporary_password_fields(), 'temporary_password': passwords[-1]})
+
+        with transaction.atomic():
+            users = User.objects.bulk_create_users(specs)
+            queue_invitation_emails(list(zip(users, passwords)), request.user)
+
+        return Response(UserSerializer(users, many=True).data, status=status.HTTP_201_CREATED)
 
     def perform_update(self, serializer):
         """
@@ -340,12 +402,12 @@ class UserViewSet(viewsets.ModelViewSet):
         - Only admins and superusers can delete users
         - Admins can only delete users in their own business
         - Prevents cross-business user deletion
+
+        Business isolation is enforced by get_queryset: users outside the
+        admin's business are not found by the lookup and return 404.
         """
 
         if not self.request.user.is_superuser and self.request.user.role != 'admin':
             raise PermissionDenied("You don't have permission to delete users")
 
-        if not self.request.user.is_superuser and instance.business_id != self.request.user.business_id:
-            raise PermissionDenied("You can't delete users outside your business")
-
         instance.delete()
@@ -1,11 +1,78 @@
-from openai import OpenAI
 from django.conf import settings
+from bisect import bisect_right
+from collections import defaultdict
+import functools
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
-def get_ai_response(user_message, products, user):
+DIRECT_MATCH_PREFIXES = (
+    'tell me about', 'tell me aboutthe', 'tell me abouta', 'tell me aboutan',
+    'what about', 'how about', 'info on', 'details on', 'about',
+    'aboutthe', 'abouta', 'aboutan'
+)
+
+DIRECT_MATCH_FILLER_WORDS = ('the', 'a', 'an', 'is', 'are', 'was', 'were')
+
+SEARCH_PHRASES_TO_REMOVE = (
+    'do you have', 'is there', 'looking for', 'searching for',
+    'tell me about', 'information about', 'details about', 'show me',
+    'what about', 'how about', 'tell me more about', 'i want',
+    'i need', 'i\'m looking for', 'can you show', 'can you tell',
+    'find', 'search', 'info on', 'details on', 'about',
+    'tell me aboutthe', 'tell me abouta', 'tell me aboutan',
+    'aboutthe', 'abouta', 'aboutan'
+)
+
+SEARCH_STOP_WORDS = frozenset({'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'is', 'are'})
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+PROMPT_PRODUCT_LIMIT = 20
+
+SPECIFIC_PRODUCT_QUERY_RE = re.compile('|'.join([
+    r'^(?:tell me about|what about|how about|info(?:rmation)? on|details? on|about)\s*(?:.+?)$',
+    r'^(?:do you have|is there)\s*(?:a|an)?\s*(?:.+?)(?:\?|$)',
+    r'^(?:i want|i need|i\'m looking for)\s*(?:the|a|an)?\s*(?:.+?)$',
+    r'^(?:.+?)\s+(?:info|information|details)$',
+    r'^(?:show|display|get)\s+(?:me\s+)?(?:info|information|details)?\s*(?:on|about)?\s*(?:.+?)$',
+]), re.IGNORECASE)
+
+PRODUCT_SEARCH_RE = re.compile('|'.join([
+    r'(?:do you have|is there|looking for|search(?:ing)? for|find)\s*(?:.+?)(?:\?|$)',
+    r'(?:what about|how about|tell me more about)\s*(?:the\s+)?(?:.+?)(?:\?|$)',
+    r'(?:i want|i need|i\'m looking for)\s*(?:a|an|the)?\s*(?:.+?)(?:\?|$)',
+    r'^(?:.+?)(?:\?)?$',
+]), re.IGNORECASE)
+
+PRODUCT_QUERY_RE = re.compile(
+    r'product|have|available|stock|items|catalog|listing|what do you|show me|list',
+    re.IGNORECASE
+)
+
+PURCHASE_QUERY_RE = re.compile(
+    r'buy|purchase|order|checkout|payment|shipping|delivery|cart',
+    re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client(api_key, timeout=10):
+    """
+    Return a shared OpenAI client for the given API key
+
+    The client owns an HTTP connection pool, so building one per query
+    throws away warm connections (and their TLS sessions). Keyed on the API
+    key and timeout so changing either gets a fresh client.
+
+    The openai package is imported here rather than at module level: it is
+    slow to import and deployments without an API key never need it.
+    """
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key, timeout=timeout)
+
+def get_ai_response(user_message, catalog, user):
     """
     Main AI Response Generation Function
 
@@ -14,14 +81,14 @@ def get_ai_response(user_message, products, user):
 
     Process Flow:
     1. Check OpenAI API availability
-    2. Build product context from approved products
+    2. Index the approved product catalog for local search
     3. Analyze query type (product search, purchase, general)
     4. Generate appropriate response using AI or local processing
     5. Handle errors gracefully with fallback mechanisms
 
     Args:
         user_message (str): User's natural language query
-        products (QuerySet): Approved products available to the user
+        catalog (dict): Approved product catalog available to the user (see chatbot.catalog)
         user (User): Authenticated user making the request
 
     Returns:
@@ -44,46 +111,143 @@ def get_ai_response(user_message, products, user):
 
         if not settings.OPENAI_API_KEY:
             logger.info("OpenAI API key not configured, using local processing")
-            return handle_local_product_query(user_message, products, user)
+            return handle_local_product_query(user_message, catalog, user)
 
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = get_openai_client(settings.OPENAI_API_KEY, settings.OPENAI_TIMEOUT)
         model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
 
-        product_list = []
-        if products:
-            for product in products:
-                product_list.append({
-                    'id': product.id,
-                    'name': product.name,
-                    'description': product.description,
-                    'price': str(product.price),
-                    'business': product.business.name,
-                })
-
         try:
 
-            if is_purchase_query(user_message):
-                return handle_purchase_query(user_message, product_list, user)
+            search_index = build_search_index(catalog['products'])
+
+            local_response = get_intent_response(user_message, catalog, user, search_index)
+            if local_response is not None:
+                return local_response
+
+            response = client.chat.completions.create(
+                model=model,
+                messages=build_chat_messages(user_message, catalog, search_index),
+                max_tokens=1000,
+                temperature=0.7
+            )
+
+            return response.choices[0].message.content
+
+        except Exception as e:
+
+            logger.error("OpenAI API error: %s", e)
+
+            return handle_local_product_query(user_message, catalog, user)
+
+    except Exception as e:
+
+        logger.error("AI service error: %s", e)
+
+        return handle_local_product_query(user_message, catalog, user)
+
+def stream_ai_response(user_message, catalog, user):
+    """
+    Streaming variant of get_ai_response
+
+    Yields the response as text chunks so the view can forward OpenAI tokens
+    as they arrive instead of holding the worker until the full completion
+    is generated. Locally answered intents are yielded as a single chunk.
+
+    Args:
+        user_message (str): User's natural language query
+        catalog (dict): Approved product catalog available to the user
+        user (User): Authenticated user making the request
+
+    Yields:
+        str: Consecutive pieces of the response
+
+    Error Handling:
+    - OpenAI failure before any output: Falls back to local processing
+    - OpenAI failure mid-stream: Ends the stream with what was already sent
+    """
+    if not settings.OPENAI_API_KEY:
+        yield handle_local_product_query(user_message, catalog, user)
+        return
+
+    search_index = build_search_index(catalog['products'])
+
+    local_response = get_intent_response(user_message, catalog, user, search_index)
+    if local_response is not None:
+        yield local_response
+        return
 
-            if is_product_search(user_message) or is_specific_product_query(user_message):
-                matching_products = search_products(user_message, product_list)
-                if matching_products:
-                    return generate_detailed_product_response(matching_products, user_message)
-                else:
+    sent_any = False
+    try:
+        client = get_openai_client(settings.OPENAI_API_KEY, settings.OPENAI_TIMEOUT)
+        stream = client.chat.completions.create(
+            model=getattr(settings, "OPENAI_MODEL", "gpt-4o-mini"),
+            messages=build_chat_messages(user_message, catalog, search_index),
+            max_tokens=1000,
+            temperature=0.7,
+            stream=True
+        )
+        for chunk in stream:
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if content:
+                sent_any = True
+                yield content
+    except Exception as e:
+
+        logger.error("OpenAI streaming error: %s", e)
+
+        if not sent_any:
+            yield handle_local_product_query(user_message, catalog, user)
+
+def get_intent_response(user_message, catalog, user, search_index=None):
+    """
+    Answer purchase, search and catalog intents locally
 
-                    search_term = extract_search_terms(user_message)[0] if extract_search_terms(user_message) else "that term"
-                    return f"🔍 I couldn't find any products matching '{search_term}'.\n\n{generate_product_listing_response(product_list)}"
+    Returns:
+        str: Local response, or None when the query should go to OpenAI
+    """
+    product_list = catalog['products']
+    if search_index is None:
+        search_index = build_search_index(product_list)
+
+    if is_purchase_query(user_message):
+        return handle_purchase_query(user_message, product_list, user, search_index)
+
+    if is_product_search(user_message) or is_specific_product_query(user_message):
+        matching_products = search_products(user_message, product_list, search_index)
+        if matching_products:
+            return generate_detailed_product_response(matching_products, user_message)
+        else:
 
-            if is_product_query(user_message):
-                return generate_product_listing_response(product_list)
+            search_term = extract_search_terms(user_message)[0] if extract_search_terms(user_message) else "that term"
+            return f"🔍 I couldn't find any products matching '{search_term}'.\n\n{catalog['listing_response']}"
 
-            system_prompt = f"""You are a helpful AI assistant for a product marketplace called "Product Marketplace".
+    if is_product_query(user_message):
+        return catalog['listing_response']
+
+    return None
+
+def build_chat_messages(user_message, catalog, search_index=None):
+    """
+    Build the OpenAI chat messages (system prompt with catalog + user query)
+
+    Only PROMPT_PRODUCT_LIMIT products are embedded: the best search matches
+    for the query, or the first products of the catalog when nothing
+    matches. Large catalogs would otherwise be sent (and billed as input
+    tokens) in full on every call.
+    """
+    matching_products = search_products(user_message, catalog['products'], search_index)
+    if matching_products:
+        prompt_context = format_products_for_prompt(matching_products[:PROMPT_PRODUCT_LIMIT])
+    else:
+        prompt_context = catalog['prompt_context']
+
+    system_prompt = f"""You are a helpful AI assistant for a product marketplace called "Product Marketplace".
 You help users find products, answer questions about them, and guide them through the purchasing process.
 
-Current catalog status: {len(product_list)} products available
+Current catalog status: {len(catalog['products'])} products available
 
 Product Catalog:
-{format_products_for_prompt(product_list)}
+{prompt_context}
 
 Guidelines:
 - Be friendly and helpful
@@ -93,88 +257,131 @@ Guidelines:
 - Use emojis to make responses more engaging
 - Keep responses concise but informative"""
 
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=1000,
-                temperature=0.7,
-                timeout=10
-            )
-
-            return response.choices[0].message.content
-
-        except Exception as e:
-
-            logger.error(f"OpenAI API error: {str(e)}")
-
-            return handle_local_product_query(user_message, products, user)
-
-    except Exception as e:
-
-        logger.error(f"AI service error: {str(e)}")
-
-        return handle_local_product_query(user_message, products, user)
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
+    ]
 
-def handle_local_product_query(user_message, products, user):
+def handle_local_product_query(user_message, catalog, user):
     """
     Handle product queries locally without using OpenAI
     """
+    product_list = catalog['products']
+    search_index = build_search_index(product_list)
 
-    product_list = []
-    if products:
-        for product in products:
-            product_list.append({
-                'id': product.id,
-                'name': product.name,
-                'description': product.description,
-                'price': str(product.price),
-                'business': product.business.name
-            })
-
-    direct_product_match = find_direct_product_match(user_message, product_list)
+    direct_product_match = find_direct_product_match(user_message, product_list, search_index)
     if direct_product_match:
         return generate_detailed_product_response([direct_product_match], user_message)
 
     if is_specific_product_query(user_message) or is_product_search(user_message):
-        matching_products = search_products(user_message, product_list)
+        matching_products = search_products(user_message, product_list, search_index)
         if matching_products:
             return generate_detailed_product_response(matching_products, user_message)
         else:
 
             search_term = extract_search_terms(user_message)[0] if extract_search_terms(user_message) else "that"
-            return f"🔍 I couldn't find any products matching '{search_term}'.\n\n{generate_product_listing_response(product_list)}"
+            return f"🔍 I couldn't find any products matching '{search_term}'.\n\n{catalog['listing_response']}"
 
     if is_purchase_query(user_message):
-        return handle_purchase_query(user_message, product_list, user)
+        return handle_purchase_query(user_message, product_list, user, search_index)
 
-    return generate_product_listing_response(product_list)
+    return catalog['listing_response']
 
-def find_direct_product_match(query, products):
+def build_search_index(products):
+    """
+    Build a reusable search index for a product list
+
+    Every search helper used to re-lowercase every product name and
+    description on each call. The index does that once per product list and
+    also maps each lowercase name word to the positions of the products
+    whose name contains it.
+
+    Names and descriptions are also joined into one text blob each, so a
+    search term is located across the whole catalog by str.find in C
+    instead of a Python loop over every product (see products_containing).
+
+    Args:
+        products (list): Product dicts as built by chatbot.catalog
+
+    Returns:
+        dict: 'names' and 'descriptions' (lowercased, aligned with products),
+              'name_words' (word -> set of product positions) and
+              'name_blob'/'description_blob' ((text, start offsets) pairs)
+    """
+    names = [product['name'].lower() for product in products]
+    descriptions = [product['description'].lower() for product in products]
+
+    name_words = defaultdict(set)
+    for idx, name in enumerate(names):
+        for word in name.split():
+            name_words[word].add(idx)
+
+    return {
+        'names': names,
+        'descriptions': descriptions,
+        'name_words': name_words,
+        'name_blob': build_text_blob(names),
+        'description_blob': build_text_blob(descriptions),
+    }
+
+def build_text_blob(texts):
+    """
+    Join texts with NUL separators and record where each one starts
+
+    Search terms never contain NUL, so a match cannot span two products.
+    """
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + 1
+    return '\0'.join(texts), offsets
+
+def products_containing(term, text_blob):
+    """
+    Positions of the products whose text contains term as a substring
+
+    After a hit the scan jumps to the next product's text, so each product
+    costs at most one str.find call and non-matching products cost nothing
+    at the Python level.
+    """
+    text, offsets = text_blob
+    matches = set()
+    position = text.find(term)
+    while position != -1:
+        idx = bisect_right(offsets, position) - 1
+        matches.add(idx)
+        if idx + 1 >= len(offsets):
+            break
+        position = text.find(term, offsets[idx + 1])
+    return matches
+
+def strip_first_prefix(text, prefixes):
+    """
+    Remove the first prefix (in tuple order) that text starts with
+
+    str.startswith(tuple) rejects the common no-prefix case in a single C call
+    before the ordered scan picks which prefix to remove.
+    """
+    if text.startswith(prefixes):
+        for prefix in prefixes:
+            if text.startswith(prefix):
+                return text[len(prefix):]
+    return text
+
+def find_direct_product_match(query, products, search_index=None):
     """
     Find if the query directly mentions a product name (even without spaces)
     """
     if not products:
         return None
 
-    query_lower = query.lower()
-
-    prefixes = [
-        'tell me about', 'tell me aboutthe', 'tell me abouta', 'tell me aboutan',
-        'what about', 'how about', 'info on', 'details on', 'about',
-        'tell me about', 'tell me about ', 'about ', 'aboutthe', 'abouta', 'aboutan'
-    ]
+    if search_index is None:
+        search_index = build_search_index(products)
 
-    cleaned_query = query_lower
-    for prefix in prefixes:
-        if cleaned_query.startswith(prefix):
-            cleaned_query = cleaned_query[len(prefix):]
-            break
+    cleaned_query = strip_first_prefix(query.lower(), DIRECT_MATCH_PREFIXES)
 
-    common_words = ['the', 'a', 'an', 'is', 'are', 'was', 'were']
-    for word in common_words:
+    for word in DIRECT_MATCH_FILLER_WORDS:
         if cleaned_query.startswith(word + ' '):
             cleaned_query = cleaned_query[len(word)+1:]
         elif cleaned_query.endswith(' ' + word):
@@ -182,8 +389,7 @@ def find_direct_product_match(query, products):
 
     cleaned_query = cleaned_query.strip()
 
-    for product in products:
-        product_name_lower = product['name'].lower()
+    for product, product_name_lower in zip(products, search_index['names']):
 
         if cleaned_query == product_name_lower:
             return product
@@ -200,53 +406,31 @@ def is_specific_product_query(message):
     """
     Check if the user is asking about a specific product
     """
-    message_lower = message.lower()
-
-    specific_patterns = [
-        r'^(?:tell me about|what about|how about|info(?:rmation)? on|details? on|about)\s*(.+?)$',
-        r'^(?:do you have|is there)\s*(?:a|an)?\s*(.+?)(?:\?|$)',
-        r'^(?:i want|i need|i\'m looking for)\s*(?:the|a|an)?\s*(.+?)$',
-        r'^(.+?)\s+(?:info|information|details)$',
-        r'^(?:show|display|get)\s+(?:me\s+)?(?:info|information|details)?\s*(?:on|about)?\s*(.+?)$',
-    ]
-
-    for pattern in specific_patterns:
-        if re.search(pattern, message_lower, re.IGNORECASE):
-            return True
-
-    return False
+    return SPECIFIC_PRODUCT_QUERY_RE.search(message) is not None
 
 def is_product_search(message):
     """
     Check if the user is searching for a specific product
     """
-    message_lower = message.lower()
+    return PRODUCT_SEARCH_RE.search(message) is not None
 
-    search_patterns = [
-        r'(?:do you have|is there|looking for|search(?:ing)? for|find)\s*(.+?)(?:\?|$)',
-        r'(?:what about|how about|tell me more about)\s*(?:the\s+)?(.+?)(?:\?|$)',
-        r'(?:i want|i need|i\'m looking for)\s*(?:a|an|the)?\s*(.+?)(?:\?|$)',
-        r'^(.+?)(?:\?)?$',
-    ]
-
-    for pattern in search_patterns:
-        if re.search(pattern, message_lower, re.IGNORECASE):
-            return True
-
-    return False
-
-def search_products(query, products):
+def search_products(query, products, search_index=None):
     """
     Search for products matching the user's query
     """
     if not products:
         return []
 
+    if search_index is None:
+        search_index = build_search_index(products)
+
+    names = search_index['names']
+    descriptions = search_index['descriptions']
+
     query_lower = query.lower()
     matching_products = []
 
-    for product in products:
-        product_name_lower = product['name'].lower()
+    for product, product_name_lower in zip(products, names):
 
         if product_name_lower in query_lower or query_lower in product_name_lower:
 
@@ -261,34 +445,30 @@ def search_products(query, products):
 
     search_terms = extract_search_terms(query_lower)
 
-    for product in products:
-        score = 0
-        product_name_lower = product['name'].lower()
-        product_desc_lower = product['description'].lower()
-
-        if search_terms:
-            for term in search_terms:
-                if term and len(term) > 1:
-
-                    if term in product_name_lower:
-                        score += 10
-
-                    elif term in product_desc_lower:
-                        score += 3
-        else:
+    scores = [0] * len(products)
+    for word in set(query_lower.split()):
+        for idx in search_index['name_words'].get(word, ()):
+            scores[idx] += 5
+
+    if search_terms:
+        for term in search_terms:
+            if term and len(term) > 1:
+                name_hits = products_containing(term, search_index['name_blob'])
+                description_hits = products_containing(term, search_index['description_blob']) - name_hits
+
+                for idx in name_hits:
+                    scores[idx] += 10
+                for idx in description_hits:
+                    scores[idx] += 3
+    else:
 
+        for idx, (product_name_lower, product_desc_lower) in enumerate(zip(names, descriptions)):
             if query_lower in product_name_lower:
-                score += 5
+                scores[idx] += 5
             elif query_lower in product_desc_lower:
-                score += 2
+                scores[idx] += 2
 
-        query_words = set(query_lower.split())
-        product_words = set(product_name_lower.split())
-        common_words = query_words.intersection(product_words)
-        score += len(common_words) * 5
-
-        if score > 0:
-            matching_products.append((score, product))
+    matching_products = [(score, product) for score, product in zip(scores, products) if score > 0]
 
     matching_products.sort(reverse=True, key=lambda x: x[0])
     return [p for score, p in matching_products]
@@ -297,28 +477,12 @@ def extract_search_terms(query):
     """
     Extract search terms from natural language queries, handling cases without spaces
     """
+    cleaned_query = strip_first_prefix(query, SEARCH_PHRASES_TO_REMOVE)
 
-    phrases_to_remove = [
-        'do you have', 'is there', 'looking for', 'searching for',
-        'tell me about', 'information about', 'details about', 'show me',
-        'what about', 'how about', 'tell me more about', 'i want',
-        'i need', 'i\'m looking for', 'can you show', 'can you tell',
-        'find', 'search', 'info on', 'details on', 'about', 'tell me about',
-        'tell me aboutthe', 'tell me abouta', 'tell me aboutan',
-        'aboutthe', 'abouta', 'aboutan'
-    ]
-
-    cleaned_query = query
-    for phrase in phrases_to_remove:
-        if cleaned_query.startswith(phrase):
-            cleaned_query = cleaned_query[len(phrase):]
-            break
-
-    cleaned_query = re.sub(r'[^\w\s]', ' ', cleaned_query)
-    cleaned_query = ' '.join(cleaned_query.split())
+    words = PUNCTUATION_RE.sub(' ', cleaned_query).split()
+    cleaned_query = ' '.join(words)
 
-    common_words = {'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'is', 'are'}
-    terms = [term.strip() for term in cleaned_query.split() if term.strip() and term.strip() not in common_words]
+    terms = [term for term in words if term not in SEARCH_STOP_WORDS]
 
     return terms if terms else [cleaned_query]
 
@@ -358,36 +522,13 @@ def is_product_query(message):
     """
     Check if the user is asking about products
     """
-    message_lower = message.lower()
-
-    product_phrases = [
-        'product', 'products', 'have', 'available', 'stock', 'items',
-        'catalog', 'listing', 'what do you', 'show me', 'list',
-        'all products', 'what products'
-    ]
-
-    for phrase in product_phrases:
-        if phrase in message_lower:
-            return True
-
-    return False
+    return PRODUCT_QUERY_RE.search(message) is not None
 
 def is_purchase_query(message):
     """
     Check if the user is asking about purchasing
     """
-    message_lower = message.lower()
-
-    purchase_keywords = [
-        'buy', 'purchase', 'order', 'checkout', 'payment',
-        'shipping', 'delivery', 'cart'
-    ]
-
-    for keyword in purchase_keywords:
-        if keyword in message_lower:
-            return True
-
-    return False
+    return PURCHASE_QUERY_RE.search(message) is not None
 
 def format_products_for_prompt(products):
     """
@@ -396,14 +537,13 @@ def format_products_for_prompt(products):
     if not products:
         return "No products are currently available in the marketplace."
 
-    formatted = ""
-    for idx, product in enumerate(products, 1):
-        formatted += f"{idx}. {product['name']}\n"
-        formatted += f"   Price: ${product['price']}\n"
-        formatted += f"   Description: {product['description'][:100]}...\n"
-        formatted += f"   Sold by: {product['business']}\n\n"
-
-    return formatted
+    return ''.join(
+        f"{idx}. {product['name']}\n"
+        f"   Price: ${product['price']}\n"
+        f"   Description: {product['description'][:100]}...\n"
+        f"   Sold by: {product['business']}\n\n"
+        for idx, product in enumerate(products, 1)
+    )
 
 def generate_product_listing_response(products):
     """
@@ -412,25 +552,30 @@ def generate_product_listing_response(products):
     if not products:
         return " I'm sorry, but there are currently no products available in the marketplace. Please check back later!"
 
-    response = " **Here are all the products available in our marketplace:**\n\n"
+    parts = [" **Here are all the products available in our marketplace:**\n\n"]
 
     for idx, product in enumerate(products, 1):
-        response += f"**{idx}. {product['name']}**\n"
-        response += f" Price: ${product['price']}\n"
-        response += f" Description: {product['description'][:150]}...\n"
-        response += f" Sold by: {product['business']}\n\n"
+        parts.append(
+            f"**{idx}. {product['name']}**\n"
+            f" Price: ${product['price']}\n"
+            f" Description: {product['description'][:150]}...\n"
+            f" Sold by: {product['business']}\n\n"
+        )
 
-    response += "✨ **To see details about a specific product, just ask!** (e.g., 'Tell me about maize' or 'Show me beans')"
-    return response
+    parts.append("✨ **To see details about a specific product, just ask!** (e.g., 'Tell me about maize' or 'Show me beans')")
+    return ''.join(parts)
 
-def handle_purchase_query(query, products, user):
+def handle_purchase_query(query, products, user, search_index=None):
     """
     Handle purchase-related queries
     """
     query_lower = query.lower()
 
-    for product in products:
-        if product['name'].lower() in query_lower:
+    if search_index is None:
+        search_index = build_search_index(products)
+
+    for product, product_name_lower in zip(products, search_index['names']):
+        if product_name_lower in query_lower:
             return generate_purchase_specific_product_response(product, user)
 
     return generate_general_purchase_response(products, user)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class ChatbotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chatbot'
+
+    def ready(self):
+        from . import catalog  # noqa: F401  (connects catalog cache invalidation signals)
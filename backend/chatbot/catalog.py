@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from businesses.models import Business
+from products.models import Product
+from .ai_service import PROMPT_PRODUCT_LIMIT, format_products_for_prompt, generate_product_listing_response
+
+CATALOG_CACHE_TTL = 60
+
+ALL_BUSINESSES = 'all'
+
+def catalog_cache_key(scope):
+    """Cache key for the approved catalog of one business, or ALL_BUSINESSES"""
+    return f'chatbot_catalog:{scope}'
+
+def build_product_list(products):
+    """
+    Convert approved products into the plain dicts the AI service works with
+
+    Reads rows with values() (business name joined in SQL), so no Product
+    or Business model instances are constructed.
+
+    Args:
+        products (QuerySet): Products to include
+
+    Returns:
+        list: One dict per product (id, name, description, price, business)
+    """
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'description': row['description'],
+            'price': str(row['price']),
+            'business': row['business__name'],
+        }
+        for row in products.values('id', 'name', 'description', 'price', 'business__name')
+    ]
+
+def build_catalog(product_list):
+    """
+    Bundle a product list with the text the chatbot renders from it
+
+    The system prompt block and the full listing response only depend on
+    the catalog, so they are rendered once per cached catalog instead of on
+    every chat query.
+
+    Returns:
+        dict: 'products' (list of product dicts), 'prompt_context' (first
+              PROMPT_PRODUCT_LIMIT products) and 'listing_response'
+    """
+    return {
+        'products': product_list,
+        'prompt_context': format_products_for_prompt(product_list[:PROMPT_PRODUCT_LIMIT]),
+        'listing_response': generate_product_listing_response(product_list),
+    }
+
+def get_product_catalog(user):
+    """
+    Approved Product Catalog for Chatbot Queries
+
+    The catalog rarely changes between chat turns, so it is cached per
+    business for CATALOG_CACHE_TTL seconds and evicted as soon as a product
+    or business is saved or deleted.
+
+    Business Isolation:
+    - Superusers: Approved products from all businesses
+    - Business members: Approved products from their business only
+    - Users without a business: No products
+
+    Args:
+        user (User): Authenticated user making the chat query
+
+    Returns:
+        dict: Catalog as produced by build_catalog
+    """
+    if user.is_superuser:
+        scope = ALL_BUSINESSES
+    elif getattr(user, "business_id", None):
+        scope = user.business_id
+    else:
+        return build_catalog([])
+
+    def load():
+        products = Product.objects.filter(status='approved')
+        if scope != ALL_BUSINESSES:
+            products = products.filter(business_id=scope)
+        return build_catalog(build_product_list(products))
+
+    return cache.get_or_set(catalog_cache_key(scope), load, CATALOG_CACHE_TTL)
+
+def invalidate_product_catalog(business_id):
+    """Evict the cached catalog of a business and the all-businesses catalog"""
+    cache.delete_many([catalog_cache_key(business_id), catalog_cache_key(ALL_BUSINESSES)])
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_catalog_on_product_change(sender, instance, **kwargs):
+    invalidate_product_catalog(instance.business_id)
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def invalidate_catalog_on_business_change(sender, instance, **kwargs):
+    invalidate_product_catalog(instance.pk)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['user', '-created_at'], name='chatbot_cha_user_id_753d9c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['-created_at'], name='chatbot_cha_created_fcf056_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from config.pagination import CachedCountPagination
+
+CHAT_COUNT_CACHE_TTL = 30
+
+def chat_count_cache_key(user_id):
+    """Cache key for the number of chat messages a user has"""
+    return f'chat_count:{user_id}'
+
+class ChatHistoryPagination(CachedCountPagination):
+    """
+    Page number pagination for a single user's chat history with a cached total
+
+    The count is evicted by chat_query whenever a new message is stored.
+    """
+    count_cache_ttl = CHAT_COUNT_CACHE_TTL
+
+    def get_count_cache_key(self, request, view):
+        return chat_count_cache_key(request.user.pk)
@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from businesses.models import Business, User
+from products.models import Product
+from chatbot.models import ChatMessage
+
+@override_settings(OPENAI_API_KEY='')
+class ChatQueryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.business = Business.objects.create(name="Test Business")
+
+        self.user = User.objects.create_user(
+            email="viewer@test.com",
+            password="testpass123",
+            business=self.business,
+            role="viewer"
+        )
+
+        for name in ['Maize', 'Beans', 'Rice']:
+            Product.objects.create(
+                name=name,
+                description=f'{name} description',
+                price='10.00',
+                business=self.business,
+                created_by=self.user,
+                status='approved'
+            )
+
+    def test_query_does_not_load_businesses_per_product(self):
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/chatbot/query/', {'message': 'show me all products'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Test Business', response.json()['response'])
+        self.assertEqual(ChatMessage.objects.count(), 1)
+
+    def test_catalog_cached_until_products_change(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.post('/api/chatbot/query/', {'message': 'show me all products'})
+
+        with self.assertNumQueries(1):
+            self.client.post('/api/chatbot/query/', {'message': 'show me all products'})
+
+        Product.objects.get(name='Rice').delete()
+
+        response = self.client.post('/api/chatbot/query/', {'message': 'show me all products'})
+        self.assertNotIn('Rice', response.json()['response'])
+
+    def test_streaming_query_emits_chunks_then_saves(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post('/api/chatbot/query/?stream=true', {'message': 'show me all products'})
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('event: chunk', body)
+        self.assertIn('event: done', body)
+        self.assertEqual(ChatMessage.objects.count(), 1)
+
+class ChatHistoryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        self.user = User.objects.create_user(
+            email="viewer@test.com",
+            password="testpass123",
+            role="viewer"
+        )
+
+        for idx in range(3):
+            ChatMessage.objects.create(user=self.user, user_message=f'question {idx}', ai_response='answer')
+
+    def test_history_count_cached_between_pages(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/chatbot/history/')
+        self.assertEqual(response.json()['count'], 3)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/chatbot/history/')
+        self.assertEqual(response.json()['count'], 3)
+
+    @override_settings(OPENAI_API_KEY='')
+    def test_new_message_refreshes_history_count(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/api/chatbot/history/')
+
+        self.client.post('/api/chatbot/query/', {'message': 'show me all products'})
+
+        response = self.client.get('/api/chatbot/history/')
+        self.assertEqual(response.json()['count'], 4)
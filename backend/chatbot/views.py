@@ -2,10 +2,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+import json
+import logging
 from .models import ChatMessage
+from .pagination import ChatHistoryPagination, chat_count_cache_key
 from .serializers import ChatMessageSerializer, ChatQuerySerializer
-from .ai_service import get_ai_response
-from products.models import Product
+from .ai_service import get_ai_response, stream_ai_response
+from .catalog import get_product_catalog
+
+logger = logging.getLogger(__name__)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -18,19 +25,23 @@ def chat_query(request):
 
     Process Flow:
     1. Validate user input (message format, length, etc.)
-    2. Get relevant product context based on user's business access
+    2. Get relevant product context based on user's business access (cached per business)
     3. Send query to AI service (OpenAI GPT) with product context
     4. Handle AI service errors gracefully with fallback responses
-    5. Store chat interaction in database for history
-    6. Return AI response to user
+    5. Return AI response to user
+    6. Store chat interaction in database for history (after the response is sent)
 
     Request Body:
     - message (str): User's natural language query
 
+    Query Parameters:
+    - stream=true: Return a text/event-stream instead of JSON (see stream_chat_response)
+
     Response:
     - message: Original user message (for confirmation)
     - response: AI-generated response with product information
-    - id: Chat message ID for reference
+    - id: Always null; the message is stored after the response is sent
+      (streamed responses report the stored ID in their 'done' event)
 
     Business Logic:
     - Users only see products from their business (business isolation)
@@ -41,7 +52,7 @@ def chat_query(request):
     Error Handling:
     - Invalid input: Returns validation errors
     - AI service failure: Falls back to local product search
-    - Database errors: Returns appropriate error messages
+    - History save errors: Logged (the response has already been sent)
     - Rate limiting: Handled by DRF throttling (configured in settings)
 
     Security Features:
@@ -57,55 +68,111 @@ def chat_query(request):
 
     user_message = serializer.validated_data['message']
 
-    products = Product.objects.filter(status='approved')
-
-    if request.user.is_superuser:
-
-        pass
-    elif getattr(request.user, "business_id", None):
+    catalog = get_product_catalog(request.user)
 
-        products = products.filter(business=request.user.business)
-    else:
-
-        products = Product.objects.none()
+    if request.query_params.get('stream') == 'true':
+        return stream_chat_response(request.user, user_message, catalog)
 
     try:
-        ai_response = get_ai_response(user_message, products, request.user)
+        ai_response = get_ai_response(user_message, catalog, request.user)
     except Exception as e:
 
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"AI service error for user {request.user.email}: {str(e)}")
+        logger.error("AI service error for user %s: %s", request.user.email, e)
 
         return Response(
             {'error': 'I\'m having trouble processing your request right now. Please try again later.'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+    return DeferredSaveResponse(
+        {
+            'message': user_message,
+            'response': ai_response,
+            'id': None,
+        },
+        on_close=lambda: save_chat_message(request.user, user_message, ai_response)
+    )
+
+def save_chat_message(user, user_message, ai_response):
+    """
+    Store a chat interaction in the user's history
+
+    Returns:
+        ChatMessage: The saved message, or None if saving failed (logged)
+    """
     try:
         chat_message = ChatMessage.objects.create(
-            user=request.user,
+            user=user,
             user_message=user_message,
             ai_response=ai_response
         )
     except Exception as e:
+        logger.error("Failed to save chat message for user %s: %s", user.email, e)
+        return None
 
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Failed to save chat message for user {request.user.email}: {str(e)}")
+    cache.delete(chat_count_cache_key(user.pk))
+    return chat_message
 
-        return Response({
-            'message': user_message,
-            'response': ai_response,
-            'id': None,
-            'warning': 'Response generated but not saved to history'
-        })
+class DeferredSaveResponse(Response):
+    """
+    Response that runs a callback after it has been sent
+
+    WSGI servers call close() once the body is written, so work done there
+    (here: the chat history INSERT) no longer adds to the latency the user
+    sees. The callback runs before Django's request_finished handling so it
+    still uses the request's database connection.
+    """
 
-    return Response({
-        'message': user_message,
-        'response': ai_response,
-        'id': chat_message.id
-    })
+    def __init__(self, data=None, on_close=None, **kwargs):
+        super().__init__(data, **kwargs)
+        self.on_close = on_close
+
+    def close(self):
+        if self.on_close is not None:
+            on_close, self.on_close = self.on_close, None
+            on_close()
+        super().close()
+
+def sse_event(event, data):
+    """Encode one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_chat_response(user, user_message, catalog):
+    """
+    Streaming Chat Response (Server-Sent Events)
+
+    Forwards the AI response while it is being generated, so the first
+    tokens reach the client without waiting for the whole completion.
+
+    Events:
+    - chunk: {"content": "..."} for each piece of the response
+    - done: {"message", "response", "id"} once the full response is stored
+    - error: {"error": "..."} if the response could not be generated
+
+    The chat message is only saved after the stream completes; an aborted
+    stream leaves no partial history entry.
+    """
+    def events():
+        parts = []
+        try:
+            for content in stream_ai_response(user_message, catalog, user):
+                parts.append(content)
+                yield sse_event('chunk', {'content': content})
+        except Exception as e:
+            logger.error("AI service error for user %s: %s", user.email, e)
+            yield sse_event('error', {'error': 'I\'m having trouble processing your request right now. Please try again later.'})
+            return
+
+        ai_response = ''.join(parts)
+        chat_message = save_chat_message(user, user_message, ai_response)
+        chat_message_id = chat_message.id if chat_message else None
+
+        yield sse_event('done', {'message': user_message, 'response': ai_response, 'id': chat_message_id})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 class ChatMessageViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -121,7 +188,7 @@ class ChatMessageViewSet(viewsets.ReadOnlyModelViewSet):
     Features:
     - User isolation (users only see their own chat history)
     - Chronological ordering (newest messages first)
-    - Pagination support (configured in settings.py)
+    - Pagination support (page size in settings.py, total count cached briefly)
     - Read-only access (no editing or deleting of chat history)
 
     Business Rules:
@@ -143,6 +210,7 @@ class ChatMessageViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = ChatMessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ChatHistoryPagination
 
     def get_queryset(self):
         """
@@ -156,4 +224,6 @@ class ChatMessageViewSet(viewsets.ReadOnlyModelViewSet):
         Returns:
             QuerySet: User's chat messages ordered by creation time (newest first)
         """
-        return ChatMessage.objects.filter(user=self.request.user)
+        return ChatMessage.objects.filter(user=self.request.user).only(
+            'id', 'user_message', 'ai_response', 'created_at'
+        )
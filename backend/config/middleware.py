@@ -35,15 +35,15 @@ class APILoggingMiddleware(MiddlewareMixin):
 
     def process_request(self, request):
         request.start_time = time.time()
-        logger.info(f"API Request: {request.method} {request.path}")
+        logger.info("API Request: %s %s", request.method, request.path)
         return None
 
     def process_response(self, request, response):
         if hasattr(request, 'start_time'):
             duration = time.time() - request.start_time
             logger.info(
-                f"API Response: {request.method} {request.path} "
-                f"Status: {response.status_code} Duration: {duration:.3f}s"
+                "API Response: %s %s Status: %s Duration: %.3fs",
+                request.method, request.path, response.status_code, duration
             )
         return response
 
@@ -54,8 +54,8 @@ class APIErrorHandlerMiddleware(MiddlewareMixin):
 
     def process_exception(self, request, exception):
         logger.error(
-            f"API Error: {request.method} {request.path} "
-            f"Error: {str(exception)}",
+            "API Error: %s %s Error: %s",
+            request.method, request.path, exception,
             exc_info=True
         )
         return None
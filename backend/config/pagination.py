@@ -0,0 +1,44 @@
+from functools import cached_property, partial
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from rest_framework.pagination import PageNumberPagination
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that reads the total row count from the cache
+
+    Paging through a long list otherwise runs a COUNT(*) for every page.
+    The count is shared between pages for count_cache_ttl seconds; callers
+    evict or version the key whenever the underlying rows change.
+    """
+
+    def __init__(self, object_list, per_page, count_cache_key=None, count_cache_ttl=30, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_cache_ttl = count_cache_ttl
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return Paginator.count.func(self)
+        return cache.get_or_set(self.count_cache_key, lambda: Paginator.count.func(self), self.count_cache_ttl)
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Page number pagination with a cached total
+
+    Subclasses return the cache key for the paginated queryset from
+    get_count_cache_key (None disables caching for that request).
+    """
+    count_cache_ttl = 30
+
+    def get_count_cache_key(self, request, view):
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            count_cache_key=self.get_count_cache_key(request, view),
+            count_cache_ttl=self.count_cache_ttl,
+        )
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,44 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+drf_encoder = JSONEncoder()
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON Renderer backed by orjson
+
+    Renders the same JSON as DRF's JSONRenderer (compact, UTF-8) with
+    orjson's native encoder, which is several times faster on large product
+    and chat history pages.
+
+    Compatibility:
+    - Datetimes, Decimals, lazy strings etc. fall back to DRF's JSONEncoder,
+      so their representation is unchanged
+    - U+2028/U+2029 are escaped afterwards, as DRF does, so the output stays
+      valid JavaScript
+    - Integers wider than 64 bits, which orjson rejects, and requests asking
+      for indented output (Accept: application/json; indent=4) are rendered
+      by DRF's JSONRenderer
+
+    Difference from DRF: float NaN and +/-Infinity are rendered as null,
+    where DRF's strict JSON mode raises ValueError. Checking for them would
+    mean walking every response in Python; no serializer here emits floats.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=drf_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers wider than 64 bits; anything else DRF can't encode raises there too
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -87,11 +87,27 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open across requests in each gunicorn worker instead
+        # of reconnecting per request; 0 closes after every request (use that
+        # behind an external pooler such as PgBouncer in transaction mode).
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 AUTH_USER_MODEL = 'businesses.User'
 
+# Django's defaults plus a cheap hasher used only for generated invitation
+# passwords (see businesses.hashers); the first entry hashes everything else.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'businesses.hashers.TemporaryPasswordHasher',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -116,11 +132,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'businesses.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 
@@ -182,6 +202,12 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
 }
 
+# Seconds CachedJWTAuthentication caches validated tokens and users (0 disables).
+# Cache eviction on user/business saves is per process with the LocMemCache
+# below, so with several gunicorn workers a deactivated user or changed role
+# can take up to this long to apply everywhere.
+JWT_AUTH_CACHE_TTL = config('JWT_AUTH_CACHE_TTL', default=300, cast=int)
+
 CORS_ALLOWED_ORIGINS = [
 
     "http://localhost:3000",
@@ -260,6 +286,7 @@ if SENTRY_DSN:
 
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-4o-mini')
+OPENAI_TIMEOUT = config('OPENAI_TIMEOUT', default=10, cast=float)
 
 EMAIL_BACKEND = config(
     'EMAIL_BACKEND',
@@ -278,4 +305,8 @@ DEFAULT_FROM_EMAIL = config(
     default='noreply@productmarketplace.com'
 )
 
+INVITATION_EMAIL_ASYNC = config('INVITATION_EMAIL_ASYNC', default=True, cast=bool)
+
+INVITATION_LOGIN_URL = config('INVITATION_LOGIN_URL', default='http://localhost:3000/login')
+
 configure_logging()
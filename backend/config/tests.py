@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from config.renderers import ORJSONRenderer
+
+class ORJSONRendererTestCase(SimpleTestCase):
+    def test_line_separators_escaped_like_drf(self):
+        data = {'description': 'line\u2028break\u2029end', 'name': 'café'}
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_wide_integers_rendered_like_drf(self):
+        data = {'count': 2 ** 70, 'negative': -2 ** 70, 'results': [1, 2]}
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_non_finite_floats_rendered_as_null(self):
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'price': float('nan')})
+
+        self.assertEqual(ORJSONRenderer().render({'price': float('nan'), 'max': float('inf')}),
+                         b'{"price":null,"max":null}')
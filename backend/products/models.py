@@ -44,6 +44,14 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['business', 'status']),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status='approved'),
+                name='product_approved_recent_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         """
@@ -55,6 +63,8 @@ class Product(models.Model):
 
         if not self.business_name_snapshot and self.business:
             self.business_name_snapshot = self.business.name
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = [*kwargs['update_fields'], 'business_name_snapshot']
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,76 @@
+import time
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from businesses.models import Business, User
+from config.pagination import CachedCountPagination
+from .models import Product
+
+PRODUCT_COUNT_CACHE_TTL = 30
+
+PRODUCT_COUNT_VERSION_KEY = 'product_count:version'
+
+# User columns that decide which products a user can list
+PRODUCT_SCOPE_USER_FIELDS = frozenset({'business', 'business_id', 'role', 'is_superuser'})
+
+def get_product_count_version():
+    """
+    Current generation of the cached product counts
+
+    Counts are cached per user, so they can't be evicted one by one when a
+    product changes. Every key embeds this version instead, and bumping it
+    orphans all of them at once. A fresh version starts from the clock so an
+    evicted counter never reuses an old generation.
+    """
+    version = cache.get(PRODUCT_COUNT_VERSION_KEY)
+    if version is None:
+        cache.add(PRODUCT_COUNT_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(PRODUCT_COUNT_VERSION_KEY, time.time_ns())
+    return version
+
+def invalidate_product_counts():
+    """Move every cached product count to a new generation"""
+    try:
+        cache.incr(PRODUCT_COUNT_VERSION_KEY)
+    except ValueError:
+        cache.set(PRODUCT_COUNT_VERSION_KEY, time.time_ns(), None)
+
+class ProductPagination(CachedCountPagination):
+    """
+    Product listing pagination with a cached total
+
+    Business users are keyed by user (their visible products depend on the
+    businesses they own or belong to); the public listing is the same for
+    everyone and shares one key. Any product or business change, and any
+    user change that can alter their product scope, moves all counts to a
+    new generation.
+    """
+    count_cache_ttl = PRODUCT_COUNT_CACHE_TTL
+
+    def get_count_cache_key(self, request, view):
+        version = get_product_count_version()
+        if request.query_params.get('public') == 'true':
+            return f'product_count:{version}:public'
+        return f'product_count:{version}:{request.user.pk}'
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def invalidate_product_counts_on_change(sender, **kwargs):
+    invalidate_product_counts()
+
+@receiver(post_save, sender=User)
+def invalidate_product_counts_on_user_change(sender, instance, created, update_fields, **kwargs):
+    """
+    Only user saves that may change which products they see bump the version
+
+    New users have no cached count yet, and targeted saves such as the
+    last_login update or a password hash upgrade on login leave the scope
+    alone. Full saves can't tell what changed, so they still bump it.
+    """
+    if created:
+        return
+    if update_fields is not None and not PRODUCT_SCOPE_USER_FIELDS.intersection(update_fields):
+        return
+    invalidate_product_counts()
@@ -28,4 +28,5 @@ class ProductPermission(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        return obj.business == request.user.business
+        # Compare ids so neither the product's nor the user's business row is loaded
+        return obj.business_id == request.user.business_id
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Product
 
+PUBLIC_PRODUCT_COLUMNS = ('id', 'name', 'description', 'price', 'business_name_snapshot')
+
 class PublicProductSerializer(serializers.ModelSerializer):
     """
     Public Product Serializer for Customer Browsing
@@ -26,6 +28,9 @@ class PublicProductSerializer(serializers.ModelSerializer):
     - Search results display
     - Product comparison
     - Customer-facing product listings
+
+    The public listing passes values() rows limited to PUBLIC_PRODUCT_COLUMNS
+    instead of model instances; every field here reads straight from a column.
     """
     business_name = serializers.CharField(source='business_name_snapshot', read_only=True)
 
@@ -110,6 +115,18 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Price cannot be negative")
         return value
 
+    def update(self, instance, validated_data):
+        """
+        Apply validated changes and write only those columns
+
+        ModelSerializer.update saves every column; a partial edit should only
+        rewrite the fields it touched (plus the updated_at timestamp).
+        """
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
 class ProductCreateSerializer(serializers.ModelSerializer):
     """
     Product Creation Serializer
@@ -1,4 +1,8 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from businesses.models import Business, User
@@ -6,6 +10,7 @@ from products.models import Product
 
 class ProductAPITestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
 
         self.business = Business.objects.create(name="Test Business")
@@ -123,3 +128,128 @@ class ProductAPITestCase(TestCase):
         products = data if isinstance(data, list) else data.get('results', [])
         self.assertEqual(len(products), 1)
         self.assertEqual(products[0]['name'], 'Approved Product')
+        self.assertEqual(products[0]['price'], '99.99')
+        self.assertEqual(products[0]['business_name'], 'Test Business')
+
+    def test_listing_query_count_independent_of_product_count(self):
+        for idx in range(5):
+            Product.objects.create(
+                name=f'Product {idx}',
+                description='Test',
+                price='9.99',
+                business=self.business,
+                created_by=self.editor,
+                approved_by=self.approver,
+                status='approved'
+            )
+
+        self.client.force_authenticate(user=self.viewer)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/products/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['created_by_email'], 'editor@test.com')
+
+    def test_listing_count_cached_until_products_change(self):
+        for name in ['First Product', 'Second Product']:
+            Product.objects.create(
+                name=name,
+                description='Test',
+                price='9.99',
+                business=self.business,
+                created_by=self.editor
+            )
+
+        self.client.force_authenticate(user=self.viewer)
+        self.assertEqual(self.client.get('/api/products/').json()['count'], 2)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/')
+        self.assertEqual(response.json()['count'], 2)
+
+        Product.objects.get(name='First Product').delete()
+
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_listing_count_survives_unrelated_user_saves(self):
+        Product.objects.create(
+            name='First Product',
+            description='Test',
+            price='9.99',
+            business=self.business,
+            created_by=self.editor
+        )
+
+        self.client.force_authenticate(user=self.viewer)
+        self.client.get('/api/products/')
+
+        self.admin.last_login = timezone.now()
+        self.admin.save(update_fields=['last_login'])
+
+        with self.assertNumQueries(1):
+            self.client.get('/api/products/')
+
+        self.viewer.business = Business.objects.create(name="Other Business")
+        self.viewer.save(update_fields=['business'])
+
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_retrieve_product_in_single_query(self):
+        product = Product.objects.create(
+            name='Test Product',
+            description='Test',
+            price='99.99',
+            business=self.business,
+            created_by=self.editor
+        )
+        viewer = User.objects.get(pk=self.viewer.pk)
+        self.client.force_authenticate(user=viewer)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/products/{product.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_partial_update_writes_only_changed_fields(self):
+        product = Product.objects.create(
+            name='Test Product',
+            description='Test',
+            price='99.99',
+            business=self.business,
+            created_by=self.editor
+        )
+        self.client.force_authenticate(user=self.editor)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/products/{product.id}/', {'price': '49.99'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        update = next(query['sql'] for query in queries if query['sql'].startswith('UPDATE'))
+        self.assertIn('"price"', update)
+        self.assertNotIn('"description"', update)
+
+        product.refresh_from_db()
+        self.assertEqual(str(product.price), '49.99')
+        self.assertEqual(product.description, 'Test')
+
+    def test_export_csv_streams_rows(self):
+        Product.objects.create(
+            name='Exported Product',
+            description='Test',
+            price='99.99',
+            business=self.business,
+            created_by=self.editor
+        )
+        self.client.force_authenticate(user=self.viewer)
+
+        response = self.client.get('/api/products/export_csv/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('ID,Name,Description'))
+        self.assertIn('Exported Product', lines[1])
+        self.assertIn('editor@test.com', lines[1])
@@ -1,15 +1,26 @@
+import csv
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import PermissionDenied
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from businesses.models import Business
 from .models import Product
-from .serializers import ProductSerializer, ProductCreateSerializer, PublicProductSerializer
+from .serializers import PUBLIC_PRODUCT_COLUMNS, ProductSerializer, ProductCreateSerializer, PublicProductSerializer
+from .pagination import ProductPagination
 from .permissions import ProductPermission
 
+EXPORT_CHUNK_SIZE = 500
+
+class CSVLineBuffer:
+    """File-like object whose write() hands the formatted line back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
 class ProductViewSet(viewsets.ModelViewSet):
     """
     Product Management API ViewSet
@@ -40,6 +51,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    pagination_class = ProductPagination
 
     def get_permissions(self):
         """
@@ -72,21 +84,42 @@ class ProductViewSet(viewsets.ModelViewSet):
         - Business owners: See products from businesses they own
         - Business members: See products from their associated business
         - Cross-business access: Users can be owners of multiple businesses
+
+        The public listing reads plain rows with values(), fetching only the
+        columns PublicProductSerializer renders and building no model instances.
+        Business users get the business and audit users joined in, since the
+        serializer, object permission check and CSV export read them for every row.
         """
 
         if self.request.query_params.get('public') == 'true':
-            return Product.objects.filter(status='approved')
+            products = Product.objects.filter(status='approved')
+            if self.action == 'list':
+                return products.values(*PUBLIC_PRODUCT_COLUMNS)
+            return products
 
         if not self.request.user.is_authenticated:
             return Product.objects.none()
 
+        products = Product.objects.select_related('business', 'created_by', 'approved_by')
+
         if self.request.user.is_superuser:
-            return Product.objects.all()
+            return products
+
+        return products.filter(business__in=self.get_accessible_businesses().values('id'))
+
+    def get_accessible_businesses(self):
+        """
+        Businesses the user owns or belongs to
 
-        return Product.objects.filter(
-            Q(business__owner=self.request.user) |
-            Q(business=self.request.user.business)
-        ).distinct()
+        Used as an IN (SELECT id ...) subquery on the product queryset, which
+        the (business, status) index serves directly and which needs no
+        DISTINCT, unlike OR-ing the owner join with the membership condition.
+
+        Returns:
+            QuerySet: Businesses the requesting user can access
+        """
+        user = self.request.user
+        return Business.objects.filter(Q(owner=user) | Q(id=user.business_id))
 
     def get_serializer_class(self):
         """
@@ -136,12 +169,7 @@ class ProductViewSet(viewsets.ModelViewSet):
 
             if business:
 
-                has_access = Business.objects.filter(
-                    Q(id=business.id) & (
-                        Q(owner=self.request.user) |
-                        Q(id=self.request.user.business_id)
-                    )
-                ).exists()
+                has_access = self.get_accessible_businesses().filter(id=business.id).exists()
 
                 if not has_access:
                     raise PermissionDenied("You don't have access to this business")
@@ -240,7 +268,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         product.status = 'approved'
         product.approved_by = request.user
         product.approved_at = timezone.now()
-        product.save()
+        product.save(update_fields=['status', 'approved_by', 'approved_at', 'updated_at'])
 
         serializer = self.get_serializer(product)
         return Response(serializer.data)
@@ -281,7 +309,7 @@ class ProductViewSet(viewsets.ModelViewSet):
             )
 
         product.status = 'pending_approval'
-        product.save()
+        product.save(update_fields=['status', 'updated_at'])
 
         serializer = self.get_serializer(product)
         return Response(serializer.data)
@@ -294,20 +322,25 @@ class ProductViewSet(viewsets.ModelViewSet):
         Follows the same visibility rules as the product listing:
         - Superusers: All products across all businesses
         - Regular Users: Products from their associated business
-        """
-        import csv
-        from django.http import HttpResponse
 
-        products = self.get_queryset()
+        Rows are streamed as they are read, with the queryset fetched in
+        EXPORT_CHUNK_SIZE batches, so memory stays flat however many
+        products the report covers.
+        """
+        products = self.get_queryset().iterator(chunk_size=EXPORT_CHUNK_SIZE)
 
-        response = HttpResponse(content_type='text/csv')
+        response = StreamingHttpResponse(self.export_csv_rows(products), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="product_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
+        return response
+
+    def export_csv_rows(self, products):
+        """Yield the CSV report one encoded line at a time"""
+        writer = csv.writer(CSVLineBuffer())
 
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Name', 'Description', 'Price', 'Status', 'Business', 'Created By', 'created AT', 'Approved by', 'Approved at'])
+        yield writer.writerow(['ID', 'Name', 'Description', 'Price', 'Status', 'Business', 'Created By', 'created AT', 'Approved by', 'Approved at'])
 
         for product in products:
-            writer.writerow([
+            yield writer.writerow([
                 product.id,
                 product.name,
                 product.description,
@@ -319,5 +352,3 @@ class ProductViewSet(viewsets.ModelViewSet):
                 product.approved_by.email if product.approved_by else 'N/A',
                 product.approved_at.strftime("%Y-%m-%d %H:%M:%S") if product.approved_at else 'N/A'
             ])
-
-        return response